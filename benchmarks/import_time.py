@@ -0,0 +1,53 @@
+# Guard against slow imports: importing the menu and the CLI must not pull in the heavy dependencies,
+# and must stay under a time budget. Exits with 1 on a regression.
+#
+#   python benchmarks/import_time.py [--budget SECONDS] [--repeat N]
+import argparse
+import os
+import subprocess
+import sys
+
+pyslr_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pyslr")
+
+heavy_modules = ["pandas", "numpy", "matplotlib", "pybtex", "scipy", "openpyxl"]
+
+probe = f"""
+import sys, time
+start = time.perf_counter()
+import slr, cli
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(",".join(m for m in {heavy_modules!r} if m in sys.modules))
+"""
+
+
+def measure():
+    result = subprocess.run([sys.executable, "-c", probe], cwd=pyslr_dir, capture_output=True, text=True,
+                            check=True)
+    elapsed, loaded = result.stdout.split("\n")[:2]
+    return float(elapsed), [m for m in loaded.split(",") if m]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time regression check")
+    parser.add_argument("--budget", type=float, default=0.1, help="maximum import time in seconds")
+    parser.add_argument("--repeat", type=int, default=5, help="number of measurements (the best one is kept)")
+    args = parser.parse_args()
+
+    measurements = [measure() for _ in range(args.repeat)]
+    elapsed = min(m[0] for m in measurements)
+    loaded = measurements[0][1]
+
+    print(f"import slr, cli: {elapsed * 1000:.1f} ms (budget {args.budget * 1000:.0f} ms)")
+    failed = False
+    if loaded:
+        print(f"Heavy modules imported at startup: {', '.join(loaded)}")
+        failed = True
+    if elapsed > args.budget:
+        print("Import time over budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
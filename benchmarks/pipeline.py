@@ -0,0 +1,159 @@
+# Time the pipeline stages on synthetic reviews of growing size: wall time and peak traced memory of each
+# stage, written to a JSON file that can be compared between versions.
+#
+#   python benchmarks/pipeline.py [--sizes 1000 10000 100000] [--output pipeline.json]
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # Windows: the peak resident memory is not reported
+    resource = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pyslr"))
+
+import slr  # noqa: E402
+from synthetic_corpus import write_corpus, write_config, classify_tables  # noqa: E402
+
+
+# Run a stage with its progress messages silenced, unless verbose
+def measure(function, trace_memory, verbose):
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(sys.stdout if verbose else devnull):
+        function()
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+# Write the classified tables the way a reviewer would save them, outside of the timed stages
+def classify_review():
+    from table_store import store_table
+    from xlsx_writer import write_excel
+
+    df_articles, df_authors = classify_tables(slr.df_articles, slr.df_authors, slr.dimensions,
+                                              slr.radar_dimensions)
+    for df, file_path in ((df_articles, slr.slr_articles_path), (df_authors, slr.slr_authors_path)):
+        write_excel(df, file_path)
+        store_table(df, file_path, slr.cache_path, slr.category_columns)
+    slr.load_tables()
+
+
+def update_tables(workspace):
+    slr.bib_path = os.path.join(workspace, "bib_update.bib")
+    slr.update_slr_tables_from_bibtex()
+    slr.load_tables()
+
+
+def create_tables():
+    slr.df_articles, slr.df_authors = slr.create_table_files_from_bibtex()
+    slr.num_studies = len(slr.df_articles.index)
+
+
+# The stacked plots read their counts from the dimension co-occurrence matrix, built here from scratch
+def count_stacked():
+    from cooccurrence import pair_counts
+
+    slr.dimension_cooccurrence = None
+    cooccurrence = slr.get_dimension_cooccurrence()
+    for dim1, dim2 in slr.stacked_dimensions:
+        pair_counts(cooccurrence, dim1, dim2)
+
+
+def radar_layout(radar_studies):
+    df_articles = slr.df_articles
+    slr.df_articles = df_articles.head(radar_studies)
+    try:
+        slr.create_radar_plots()
+    finally:
+        slr.df_articles = df_articles
+
+
+# Stages in pipeline order: (name, function). Each stage starts from the state the previous ones left.
+def pipeline_stages(workspace, radar_studies):
+    return [
+        ("create_table_files_from_bibtex", create_tables),
+        ("classify (setup, not a pipeline stage)", classify_review),
+        ("load_tables", slr.load_tables),
+        ("update_slr_tables_from_bibtex", lambda: update_tables(workspace)),
+        ("get_new_entries", slr.get_new_entries),
+        ("dimension counts", slr.get_dimension_counts),
+        ("geography counts", slr.get_geography_counts),
+        ("stacked counts (co-occurrence)", count_stacked),
+        (f"radar layout ({radar_studies} studies)", lambda: radar_layout(radar_studies)),
+        ("create_latex_information_table", slr.create_latex_information_table),
+        ("create_latex_summary_table", slr.create_latex_summary_table),
+    ]
+
+
+def run_size(size, args):
+    results = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workspace:
+        write_corpus(workspace, size, args.seed)
+        slr.load_config(write_config(workspace, args.jobs))
+        # The LaTeX tables are written to the working directory
+        os.chdir(workspace)
+        try:
+            for name, function in pipeline_stages(workspace, args.radar_studies):
+                elapsed, peak = measure(function, not args.no_trace_memory, args.verbose)
+                max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 if resource else None
+                results.append({"stage": name, "seconds": round(elapsed, 4),
+                                "peak_traced_mb": round(peak / 2 ** 20, 2),
+                                "max_rss_mb": round(max_rss / 2 ** 20, 2) if max_rss is not None else None})
+                rss = f"{max_rss / 2 ** 20:9.1f}" if max_rss is not None else f"{'n/a':>9}"
+                print(f"{size:>8} {name:<42} {elapsed:9.2f} {peak / 2 ** 20:10.1f} {rss}")
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def code_version():
+    try:
+        result = subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pipeline benchmark on synthetic reviews")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000], help="number of studies of each review")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="worker processes for parsing and rendering (memory of workers is not traced)")
+    parser.add_argument("--radar-studies", type=int, default=240, help="number of studies drawn in the radar stage")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic corpus")
+    parser.add_argument("--no-trace-memory", action="store_true",
+                        help="do not trace memory allocations, which slow the stages down")
+    parser.add_argument("--verbose", action="store_true", help="show the messages printed by the stages")
+    parser.add_argument("--output", default="pipeline.json", help="JSON results file (default: pipeline.json)")
+    args = parser.parse_args()
+
+    print(f"{'Studies':>8} {'Stage':<42} {'Time (s)':>9} {'Peak (MB)':>10} {'RSS (MB)':>9}")
+    report = {"version": code_version(), "python": platform.python_version(), "platform": platform.platform(),
+              "jobs": args.jobs, "seed": args.seed, "results": {}}
+    for size in args.sizes:
+        report["results"][str(size)] = run_size(size, args)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# Synthetic review workspaces for the benchmarks: Bibtex exports of the reference databases, the review
+# Bibtex file and a config.json, plus the manual classification of the review tables (dimension values,
+# radar scores and author geography) that the reviewers would otherwise fill in.
+import json
+import os
+import random
+
+pyslr_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pyslr")
+
+database_names = ["scopus", "wos"]
+
+title_words = ["tourism", "mobility", "patterns", "visitors", "spatial", "temporal", "analysis", "big", "data",
+               "social", "media", "GPS", "tracking", "urban", "destination", "behaviour", "network", "flows",
+               "visualization", "mining", "trajectories", "photos", "reviews", "hotel", "cultural", "heritage"]
+first_names = ["Ana", "João", "Maria", "Pedro", "Li", "Wei", "Sara", "David", "Emma", "Luca", "Yuki", "Omar"]
+last_names = ["Silva", "Santos", "Ferreira", "Zhang", "Wang", "Smith", "Rossi", "Müller", "Tanaka", "Garcia",
+              "Kim", "Novak", "Almeida", "Costa", "Dubois", "Jensen"]
+journals = ["Tourism Management", "Annals of Tourism Research", "Journal of Travel Research",
+            "Current Issues in Tourism", "Tourism Geographies", "Journal of Transport Geography"]
+conferences = ["Proceedings of the International Conference on Information and Communication Technologies "
+               "in Tourism", "IEEE International Conference on Big Data", "ACM SIGSPATIAL"]
+dimension_values = ["Social media", "GPS", "Mobile phone data", "Surveys", "Spatial", "Temporal",
+                    "Spatio-temporal", "Network", "Heatmap", "Flow map", "City", "Region", "Country",
+                    "Planning", "Marketing", "Management", "Recommendation", "N/A"]
+countries = {"Portugal": "Europe", "Spain": "Europe", "Italy": "Europe", "Germany": "Europe", "China": "Asia",
+             "Japan": "Asia", "South Korea": "Asia", "United States": "North America", "Canada": "North America",
+             "Brazil": "South America", "Australia": "Oceania", "South Africa": "Africa"}
+
+# Number of authors of an entry: mostly 2 to 4, sometimes a single author or a large team
+author_count_weights = {1: 10, 2: 20, 3: 25, 4: 20, 5: 12, 6: 7, 8: 4, 12: 2}
+
+
+def make_entry(rng, number):
+    words = rng.sample(title_words, rng.randint(4, 9))
+    title = " ".join(words).capitalize() + f" case study {number}"
+    num_authors = rng.choices(list(author_count_weights), weights=list(author_count_weights.values()))[0]
+    authors = " and ".join(f"{rng.choice(last_names)}, {rng.choice(first_names)}" for _ in range(num_authors))
+    if rng.random() < 0.7:
+        entry_type, venue_field, venue = "article", "journal", rng.choice(journals)
+    else:
+        entry_type, venue_field, venue = "inproceedings", "booktitle", rng.choice(conferences)
+    return (f"@{entry_type}{{ref{number},\n"
+            f"  title = {{{title}}},\n"
+            f"  author = {{{authors}}},\n"
+            f"  year = {{{rng.randint(2005, 2024)}}},\n"
+            f"  {venue_field} = {{{venue}}},\n"
+            f"  doi = {{10.1000/synthetic.{number}}}\n"
+            "}\n\n")
+
+
+def write_bib(file_path, entries):
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.writelines(entries)
+
+
+# Write the Bibtex files of a workspace with `size` studies:
+#  - bib.bib: the review entries, used to create the tables
+#  - bib_update.bib: the same entries plus 10% new ones, used to update the tables
+#  - references/<database>_old.bib and <database>.bib: two exports of each database, the new one dropping
+#    the oldest 10% of the entries and adding 10% new ones
+def write_corpus(workspace, size, seed=0):
+    rng = random.Random(seed)
+    num_new = max(size // 10, 1)
+    entries = [make_entry(rng, number) for number in range(size + num_new)]
+    write_bib(os.path.join(workspace, "bib.bib"), entries[:size])
+    write_bib(os.path.join(workspace, "bib_update.bib"), entries)
+
+    references_path = os.path.join(workspace, "references")
+    os.makedirs(references_path, exist_ok=True)
+    for bib in database_names:
+        export = rng.sample(entries[:size], size)
+        write_bib(os.path.join(references_path, f"{bib}_old.bib"), export)
+        write_bib(os.path.join(references_path, f"{bib}.bib"), export[num_new:] + entries[size:])
+    os.makedirs(os.path.join(workspace, "figures"), exist_ok=True)
+
+
+# Write the configuration of a workspace, starting from the default configuration of the tool
+def write_config(workspace, workers=1):
+    with open(os.path.join(pyslr_dir, "config.json"), 'r') as f:
+        config = json.load(f)
+    config.update({"root_dir": "", "database_names": database_names, "storage": "xlsx", "headless": True,
+                   "incremental": False, "parse_workers": workers, "render_workers": workers})
+    config_path = os.path.join(workspace, "config.json")
+    with open(config_path, 'w') as f:
+        json.dump(config, f, indent=2)
+    return config_path
+
+
+def dimension_cell(rng):
+    return ", ".join(rng.sample(dimension_values, rng.choices([1, 2, 3], weights=[5, 3, 2])[0]))
+
+
+# Fill the columns the reviewers classify by hand: one to three comma-separated values per dimension cell,
+# a score per radar dimension and the country and continent of every author
+def classify_tables(df_articles, df_authors, dimensions, radar_dimensions, seed=0):
+    rng = random.Random(seed)
+    num_articles = len(df_articles.index)
+    df_articles = df_articles.copy()
+    for dimension in dimensions:
+        if dimension not in df_articles.columns:
+            df_articles[dimension] = [dimension_cell(rng) for _ in range(num_articles)]
+    for dimension in radar_dimensions:
+        df_articles[f"{dimension} score"] = [rng.randint(0, 5) for _ in range(num_articles)]
+
+    df_authors = df_authors.copy()
+    country_list = list(countries)
+    df_authors["Country"] = [rng.choice(country_list) for _ in range(len(df_authors.index))]
+    df_authors["Continent"] = df_authors["Country"].map(countries)
+    return df_articles, df_authors
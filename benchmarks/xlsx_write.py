@@ -0,0 +1,62 @@
+# Compare DataFrame.to_excel with the streaming xlsx writer on a synthetic authors table:
+# wall time and peak traced memory of each path.
+#
+#   python benchmarks/xlsx_write.py [--rows N]
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pyslr"))
+
+from slr import author_columns  # noqa: E402
+from xlsx_writer import write_excel  # noqa: E402
+
+
+def authors_table(num_rows):
+    return pd.DataFrame({
+        "Study": [f"S{i // 4 + 1:02d}" for i in range(num_rows)],
+        "Citation": [f"key{i // 4}" for i in range(num_rows)],
+        "Year": [2000 + i % 24 for i in range(num_rows)],
+        "Venue": ["Journal" if i % 3 else "Conference" for i in range(num_rows)],
+        "Title": [f"A study of tourism mobility patterns number {i // 4}" for i in range(num_rows)],
+        "Publication": ["Journal of Tourism Research" for _ in range(num_rows)],
+        "Author": [f"Author {i}, A." for i in range(num_rows)],
+        "Department": ["Blank"] * num_rows,
+        "Institution": ["Blank"] * num_rows,
+        "City": ["Blank"] * num_rows,
+        "Country": ["Portugal" if i % 2 else "Spain" for i in range(num_rows)],
+        "Continent": ["Europe"] * num_rows,
+    }, columns=author_columns)
+
+
+def measure(write, df, file_path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    write(df, file_path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="xlsx write benchmark")
+    parser.add_argument("--rows", type=int, default=100000, help="number of author rows")
+    args = parser.parse_args()
+
+    df = authors_table(args.rows)
+    paths = {"to_excel": lambda d, p: d.to_excel(p, index=False), "write_excel": write_excel}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"{'Writer':<12} {'Time (s)':>9} {'Peak (MB)':>10}  ({args.rows} rows)")
+        for name, write in paths.items():
+            elapsed, peak = measure(write, df, os.path.join(tmp_dir, f"{name}.xlsx"))
+            print(f"{name:<12} {elapsed:9.2f} {peak / 2 ** 20:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import hashlib
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from bib_reader import iter_bib_records
+
+# Bump when the layout of BibRecord or of the cache files changes, so stale caches are parsed again
+cache_version = 3
+
+# Number of records pickled together; cached files are written and read back one chunk at a time
+chunk_size = 1000
+
+
+# The records of a Bibtex file are pickled in chunks to "<name>.pickle", and the version, size, mtime and
+# content hash of the file to "<name>.meta", so the mtime can be updated without rewriting the records
+def _cache_file_path(cache_dir, file_path):
+    name = hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{name}.pickle")
+
+
+def _meta_file_path(cache_file_path):
+    return cache_file_path[:-len(".pickle")] + ".meta"
+
+
+def file_digest(file_path):
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_meta(cache_file_path):
+    try:
+        with open(_meta_file_path(cache_file_path), 'rb') as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+
+def _write_meta(cache_file_path, meta):
+    meta_file_path = _meta_file_path(cache_file_path)
+    with open(meta_file_path + ".tmp", 'wb') as f:
+        pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(meta_file_path + ".tmp", meta_file_path)
+
+
+# Check whether the cache of a Bibtex file is up to date. The size and mtime are checked first;
+# the content hash is only computed when the mtime differs, in which case only the new mtime is recorded.
+def is_cached(cache_dir, file_path):
+    stat = os.stat(file_path)
+    cache_file_path = _cache_file_path(cache_dir, file_path)
+    meta = _read_meta(cache_file_path)
+    if meta is None or meta.get("version") != cache_version or meta["size"] != stat.st_size \
+            or not os.path.exists(cache_file_path):
+        return False
+    if meta["mtime"] == stat.st_mtime_ns:
+        return True
+    if meta["digest"] != file_digest(file_path):
+        return False
+
+    _write_meta(cache_file_path, dict(meta, mtime=stat.st_mtime_ns))
+    return True
+
+
+# The records are written first and the metadata last, so an interrupted write leaves no valid cache
+def _write_cache(cache_file_path, meta, records):
+    records = iter(records)
+    if os.path.exists(_meta_file_path(cache_file_path)):
+        os.remove(_meta_file_path(cache_file_path))
+    with open(cache_file_path + ".tmp", 'wb') as f:
+        while chunk := list(islice(records, chunk_size)):
+            pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(cache_file_path + ".tmp", cache_file_path)
+    _write_meta(cache_file_path, meta)
+
+
+# Parse a Bibtex file into the cache, streaming the records straight to disk. Returns the number of records.
+def build_cache(cache_dir, file_path):
+    stat = os.stat(file_path)
+    meta = {"version": cache_version,
+            "path": os.path.abspath(file_path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "digest": file_digest(file_path)}
+    num_records = 0
+
+    def count(records):
+        nonlocal num_records
+        for record in records:
+            num_records += 1
+            yield record
+
+    os.makedirs(cache_dir, exist_ok=True)
+    _write_cache(_cache_file_path(cache_dir, file_path), meta, count(iter_bib_records(file_path)))
+    return num_records
+
+
+def iter_cached_records(cache_dir, file_path):
+    with open(_cache_file_path(cache_dir, file_path), 'rb') as f:
+        while True:
+            try:
+                chunk = pickle.load(f)
+            except EOFError:
+                return
+            yield from chunk
+
+
+# Make sure every file is cached, parsing the changed ones across a process pool when workers > 1.
+# Returns the number of files read from the cache and parsed: {"hits", "misses"}
+def update_cache(file_paths, cache_dir, workers=1):
+    missing = [file_path for file_path in file_paths if not is_cached(cache_dir, file_path)]
+
+    if len(missing) > 1 and (workers is None or workers > 1):
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(build_cache, [cache_dir] * len(missing), missing))
+    else:
+        for file_path in missing:
+            build_cache(cache_dir, file_path)
+    return {"hits": len(file_paths) - len(missing), "misses": len(missing)}
+
+
+# Return one record stream per file, in the order of "file_paths", and the cache hits and misses of this read
+def read_bib_files(file_paths, cache_dir, workers=1):
+    stats = update_cache(file_paths, cache_dir, workers)
+    return [iter_cached_records(cache_dir, file_path) for file_path in file_paths], stats
+
+
+def print_cache_stats(stats):
+    print(f"Bibtex cache: {stats['hits']} hits, {stats['misses']} misses")
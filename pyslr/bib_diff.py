@@ -0,0 +1,70 @@
+import re
+
+_latex_command = re.compile(r"\\[a-zA-Z]+\s*")
+_non_word = re.compile(r"[\W_]+")
+_doi_prefix = re.compile(r"^(https?://(dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+
+
+# Case-fold a title and collapse LaTeX braces/commands, punctuation and whitespace
+def normalize_title(title):
+    if title is None:
+        return ""
+    title = _latex_command.sub(" ", str(title))
+    title = title.replace("{", "").replace("}", "")
+    title = _non_word.sub(" ", title.casefold())
+    return " ".join(title.split())
+
+
+def normalize_doi(doi):
+    if doi is None:
+        return ""
+    doi = _doi_prefix.sub("", str(doi).strip())
+    return "".join(doi.split()).casefold()
+
+
+# Build hash indexes (normalized title -> keys, normalized DOI -> keys) over (key, title, doi) entries
+def build_index(entries):
+    title_index = {}
+    doi_index = {}
+    for key, title, doi in entries:
+        norm_title = normalize_title(title)
+        norm_doi = normalize_doi(doi)
+        if norm_title:
+            title_index.setdefault(norm_title, []).append(key)
+        if norm_doi:
+            doi_index.setdefault(norm_doi, []).append(key)
+    return title_index, doi_index
+
+
+# Given the (key, title, doi) entries of an old and a new export, find which new entries were already present.
+# Returns a dict with the "exact" (title and DOI of the same old entry), "conflict" (title of one old entry, DOI
+# of another), "doi" (DOI only) and "title" (title only) matches, each a list of (new_key, old_key) pairs.
+# The old key of a conflict names both old entries, to be checked by hand.
+def diff_entries(old_entries, new_entries):
+    title_index, doi_index = build_index(old_entries)
+    matches = {"exact": [], "conflict": [], "doi": [], "title": []}
+    for key, title, doi in new_entries:
+        title_keys = title_index.get(normalize_title(title), [])
+        doi_keys = doi_index.get(normalize_doi(doi), [])
+        shared_keys = [old_key for old_key in doi_keys if old_key in title_keys]
+        if shared_keys:
+            matches["exact"].append((key, shared_keys[0]))
+        elif title_keys and doi_keys:
+            matches["conflict"].append((key, f"{title_keys[0]} (title), {doi_keys[0]} (DOI)"))
+        elif doi_keys:
+            matches["doi"].append((key, doi_keys[0]))
+        elif title_keys:
+            matches["title"].append((key, title_keys[0]))
+    return matches
+
+
+def duplicate_keys(matches):
+    return {new_key for pairs in matches.values() for new_key, _ in pairs}
+
+
+def write_match_report(matches, file_path):
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write("Match\tNew entry\tOld entry\n")
+        for match_type, pairs in matches.items():
+            for new_key, old_key in pairs:
+                f.write(f"{match_type}\t{new_key}\t{old_key}\n")
@@ -0,0 +1,144 @@
+import re
+from collections import namedtuple
+
+import pybtex.io
+from pybtex.database import BibliographyData, Entry, Person
+from pybtex.database.input import bibtex
+
+_entry_start = re.compile(r"@\s*[a-zA-Z]+\s*[{(]")
+_delimiters = re.compile(r'[{}()"]')
+
+# Compact, picklable view of a Bibtex entry. "fields" and "persons" keep the raw data needed to write it back.
+BibRecord = namedtuple("BibRecord", ["key", "type", "title", "year", "doi", "venue", "publication", "main_author",
+                                     "authors", "fields", "persons"])
+
+
+def get_venue(bibtex_type):
+    if bibtex_type == "inproceedings":
+        return "Conference"
+    if bibtex_type == "article":
+        return "Journal"
+    if bibtex_type == "incollection" or bibtex_type == "inbook":
+        return "Book Chapter"
+    if bibtex_type == "book":
+        return "Book"
+
+
+def get_publication(entry):
+    publication = False
+    if entry.type == "inproceedings" or entry.type == "conference":
+        publication = entry.fields.get("booktitle", False)
+    elif entry.type == "article":
+        publication = entry.fields.get("journal", False)
+    elif entry.type == "incollection" or entry.type == "inbook":
+        publication = entry.fields.get("booktitle", False)
+    elif entry.type == "book":
+        publication = entry.fields.get("booktitle", False)
+
+    if not publication:
+        publication = entry.fields.get("journal")
+
+    return publication
+
+
+def get_main_author(entry):
+    authors = entry.persons["author"]
+    return " ".join(authors[0].last_names)
+
+
+def entry_to_record(entry):
+    persons = {role: tuple(p.__str__() for p in people) for role, people in entry.persons.items()}
+    return BibRecord(key=entry.key,
+                     type=entry.type,
+                     title=entry.fields.get('title'),
+                     year=entry.fields.get('year'),
+                     doi=entry.fields.get('doi'),
+                     venue=get_venue(entry.type),
+                     publication=get_publication(entry),
+                     main_author=get_main_author(entry) if entry.persons.get("author") else None,
+                     authors=persons.get("author", ()),
+                     fields=dict(entry.fields),
+                     persons=persons)
+
+
+def record_to_entry(record):
+    persons = {role: [Person(p) for p in people] for role, people in record.persons.items()}
+    return Entry(record.type, fields=record.fields, persons=persons)
+
+
+# Split Bibtex source lines into the text of each "@type{...}" or "@type(...)" command. Braces are counted
+# separately from the delimiters of the command: a ")" only ends a "@type(...)" command outside braces and quoted
+# values, so field values may hold unbalanced parentheses.
+def iter_bib_chunks(lines):
+    chunk = []
+    closer = None
+    depth = 0
+    in_quote = False
+    for line in lines:
+        while line:
+            start = 0
+            if closer is None:
+                match = _entry_start.search(line)
+                if match is None:
+                    break
+                line = line[match.start():]
+                start = match.end() - match.start()
+                closer = "}" if line[start - 1] == "{" else ")"
+                # Depth of the braces, counting the opening brace of a "@type{...}" command
+                depth = 1 if closer == "}" else 0
+                in_quote = False
+            # Quoted values start and end at the top level of the command
+            top_level = 1 if closer == "}" else 0
+            end = None
+            for delimiter in _delimiters.finditer(line, start):
+                char = delimiter.group()
+                if char == "{":
+                    depth += 1
+                elif char == "}":
+                    depth -= 1
+                    if depth == 0 and closer == "}":
+                        end = delimiter.end()
+                        break
+                elif char == '"':
+                    if depth == top_level:
+                        in_quote = not in_quote
+                elif char == ")" and closer == ")" and depth == 0 and not in_quote:
+                    end = delimiter.end()
+                    break
+            if end is None:
+                chunk.append(line)
+                break
+            chunk.append(line[:end])
+            yield "".join(chunk)
+            chunk = []
+            closer = None
+            line = line[end:]
+    if chunk:
+        yield "".join(chunk)
+
+
+# Read a Bibtex file one entry at a time, without building the BibliographyData of the whole file.
+# "@string" macros are kept by the parser and apply to the entries that follow them.
+def iter_bib_records(file_path):
+    parser = bibtex.Parser()
+    parser.filename = file_path
+    seen_keys = set()
+    with pybtex.io.open_unicode(file_path, encoding=parser.encoding) as f:
+        for chunk in iter_bib_chunks(f):
+            parser.data = BibliographyData()
+            parser.parse_string(chunk)
+            for entry in parser.data.entries.values():
+                if entry.key.lower() in seen_keys:
+                    print(f"Repeated entry '{entry.key}' in {file_path}. Skipping.")
+                    continue
+                seen_keys.add(entry.key.lower())
+                yield entry_to_record(entry)
+
+
+def parse_bib_file(file_path):
+    return list(iter_bib_records(file_path))
+
+
+def write_bib_records(records, file_path):
+    bib_data = BibliographyData(entries={record.key: record_to_entry(record) for record in records})
+    bib_data.to_file(file_path)
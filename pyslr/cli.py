@@ -0,0 +1,171 @@
+import argparse
+import sys
+import traceback
+
+import instrument
+import slr
+
+# Stages in dependency order: the reference stages come first, then the table update, then the
+# stages that read the tables. (name, help, function, needs tables)
+stages = [
+    ("diff", "get the new entries of each database export", "get_new_entries", False),
+    ("dedup", "find near-duplicate references across databases", "find_near_duplicates", False),
+    ("update", "update the review tables from the Bibtex file", "update_slr_tables_from_bibtex", True),
+    ("plots", "create the dimension plots", "create_dimension_plots", True),
+    ("bibliometric", "create the bibliometric plots", "create_geography_plots", True),
+    ("networks", "create the collaboration network tables and plots", "create_network_analysis", True),
+    ("radar", "create the radar plots", "create_radar_plots", True),
+    ("overlay", "create the radar overlay of the selected studies", "create_radar_overlay", True),
+    ("stacked", "create the stacked dimension plots", "create_stacked_dimension_plots", True),
+    ("cooccurrence", "create the dimension co-occurrence heatmap", "create_cooccurrence_heatmap", True),
+    ("latex", "create the LaTeX information and summary tables",
+     ("create_latex_information_table", "create_latex_summary_table"), True),
+    ("export", "export the review tables (from the database) and the LaTeX tables", "export_tables", True),
+]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="pyslr", description="Systematic Literature Review tool")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="run the selected pipeline stages without the menu")
+    for name, stage_help, _, _ in stages:
+        build.add_argument(f"--{name}", action="store_true", help=stage_help)
+    build.add_argument("--all", action="store_true", help="run every stage")
+    build.add_argument("--config", default="config.json", help="configuration file (default: config.json)")
+    build.add_argument("--jobs", type=int, help="number of worker processes for parsing and rendering")
+    build.add_argument("--create", action="store_true",
+                       help="create the review tables from the Bibtex file when they cannot be read")
+    build.add_argument("--query", help="run the stages on the studies matching the query, e.g. "
+                                        "'Data source = Social media AND Year >= 2020'")
+    build.add_argument("--name", default="selection",
+                       help="folder of the outputs of the query, under selections/ (default: selection)")
+    build.add_argument("--timings", action="store_true", help="print the time, rows and figures of every step")
+    build.add_argument("--profile", action="store_true", help="profile the run with cProfile (implies --timings)")
+    build.add_argument("--trace-memory", action="store_true",
+                       help="record the peak traced memory of every step (implies --timings)")
+    build.add_argument("--trace", metavar="FILE", help="write the timings as JSON to FILE (implies --timings)")
+
+    watch = subparsers.add_parser("watch", help="rebuild the figures and LaTeX tables when their inputs change")
+    watch.add_argument("--config", default="config.json", help="configuration file (default: config.json)")
+    watch.add_argument("--jobs", type=int, help="number of worker processes for parsing and rendering")
+    watch.add_argument("--interval", type=float, help="seconds between two checks of the files")
+    watch.add_argument("--debounce", type=float,
+                       help="seconds without changes before rebuilding, so a burst of saves rebuilds once")
+
+    serve = subparsers.add_parser("serve", help="serve the statistics and figures of the review on a local web page")
+    serve.add_argument("--config", default="config.json", help="configuration file (default: config.json)")
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, help="port to listen on")
+    serve.add_argument("--cache-size", type=int, help="number of rendered figures kept in memory")
+    return parser
+
+
+def run_build(args):
+    selected = [stage for stage in stages if args.all or getattr(args, stage[0])]
+    if not selected:
+        print("No stage selected. See 'pyslr build --help'.", file=sys.stderr)
+        return 2
+
+    try:
+        slr.load_config(args.config)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"The configuration file could not be read: {e!r}", file=sys.stderr)
+        return 1
+    slr.headless = True
+    if args.jobs:
+        slr.parse_workers = args.jobs
+        slr.render_workers = args.jobs
+    # The command line options add to the instrumentation set in the configuration file
+    if args.trace:
+        slr.trace_file = args.trace
+    instrument.configure(instrument.enabled or args.timings or bool(args.trace),
+                         instrument.profile or args.profile, instrument.trace_memory or args.trace_memory)
+
+    with instrument.span("build"):
+        status = run_stages(selected, args.create, args.query, args.name)
+    slr.report_instrumentation()
+    return status
+
+
+def run_stages(selected, create, query=None, query_name="selection"):
+    tables_loaded = False
+    for name, _, functions, needs_tables in selected:
+        try:
+            with instrument.span(name):
+                if needs_tables and not tables_loaded:
+                    load_tables(create)
+                    tables_loaded = True
+                    if query:
+                        slr.select_studies(query, query_name)
+                print(f"--- {name}")
+                for function in functions if isinstance(functions, tuple) else (functions,):
+                    getattr(slr, function)()
+                if name == "update":
+                    slr.load_tables()
+        except Exception:
+            traceback.print_exc()
+            print(f"Stage '{name}' failed.", file=sys.stderr)
+            return 1
+    return 0
+
+
+def run_watch(args):
+    from watch import watch
+
+    try:
+        slr.load_config(args.config)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"The configuration file could not be read: {e!r}", file=sys.stderr)
+        return 1
+    if args.jobs:
+        slr.parse_workers = args.jobs
+        slr.render_workers = args.jobs
+    interval = args.interval if args.interval is not None else slr.config.get("watch_interval", 1.0)
+    debounce = args.debounce if args.debounce is not None else slr.config.get("watch_debounce", 2.0)
+    watch(args.config, interval, debounce)
+    return 0
+
+
+def run_serve(args):
+    import asyncio
+    from dashboard import serve
+
+    try:
+        slr.load_config(args.config)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"The configuration file could not be read: {e!r}", file=sys.stderr)
+        return 1
+    slr.headless = True
+    port = args.port if args.port is not None else slr.config.get("dashboard_port", 8050)
+    cache_size = args.cache_size if args.cache_size is not None else slr.config.get("dashboard_cache_size", 64)
+    try:
+        asyncio.run(serve(args.config, args.host, port, cache_size))
+    except KeyboardInterrupt:
+        print("Dashboard stopped.")
+    return 0
+
+
+def load_tables(create):
+    try:
+        slr.load_tables()
+    except FileNotFoundError:
+        if not create:
+            raise
+        slr.df_articles, slr.df_authors = slr.create_table_files_from_bibtex()
+        slr.num_studies = len(slr.df_articles.index)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "build":
+        return run_build(args)
+    if args.command == "watch":
+        return run_watch(args)
+    if args.command == "serve":
+        return run_serve(args)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from dimension_counts import split_dimension_values
+
+# Co-occurrence of the values of every dimension. The multi-valued cells of the dimensions are one-hot encoded once
+# into a sparse study x value matrix, whose product with itself counts, for every pair of values of any two
+# dimensions, the studies that have both. Any pair of dimensions is then a block of that matrix.
+#   matrix: sparse (value x value) co-occurrence counts
+#   labels: [(dimension, value)] of its rows and columns
+#   slices: {dimension: slice of its values}
+
+
+def one_hot(df_articles, dimensions):
+    blocks = []
+    labels = []
+    slices = {}
+    num_rows = len(df_articles.index)
+    for dimension in dimensions:
+        if dimension not in df_articles.columns:
+            print(f"Dimension '{dimension}' is missing. Skipping.")
+            continue
+        values = split_dimension_values(df_articles[dimension].reset_index(drop=True))
+        codes, uniques = pd.factorize(values)
+        if dimension == "Year":
+            order = np.argsort(uniques, kind="stable")
+            codes = np.argsort(order)[codes]
+            uniques = uniques[order]
+        block = sparse.csr_matrix((np.ones(len(codes), dtype=np.int32), (values.index.to_numpy(), codes)),
+                                  shape=(num_rows, len(uniques)))
+        # A value repeated in a cell counts once
+        block.data[:] = 1
+        slices[dimension] = slice(len(labels), len(labels) + len(uniques))
+        labels.extend((dimension, value) for value in uniques)
+        blocks.append(block)
+    incidence = sparse.hstack(blocks, format="csr") if blocks else sparse.csr_matrix((num_rows, 0), dtype=np.int32)
+    return incidence, labels, slices
+
+
+def build_cooccurrence(df_articles, dimensions):
+    incidence, labels, slices = one_hot(df_articles, dimensions)
+    return {"matrix": (incidence.T @ incidence).tocsr(), "labels": labels, "slices": slices}
+
+
+# Studies having each pair of values of two dimensions, as a DataFrame (values of dim1 x values of dim2)
+def pair_frame(cooccurrence, dim1, dim2):
+    rows = cooccurrence["slices"][dim1]
+    cols = cooccurrence["slices"][dim2]
+    labels = cooccurrence["labels"]
+    block = cooccurrence["matrix"][rows, cols].toarray()
+    return pd.DataFrame(block, index=[value for _, value in labels[rows]],
+                        columns=[value for _, value in labels[cols]])
+
+
+# Same counts in the format of the stacked plots: {dim1 value: {dim2 value: studies}}
+def pair_counts(cooccurrence, dim1, dim2):
+    frame = pair_frame(cooccurrence, dim1, dim2)
+    return {x_value: {y_value: int(count) for y_value, count in row.items()} for x_value, row in frame.iterrows()}
+
+
+# Every value of the given dimensions against every other, labelled "Dimension: value"
+def cooccurrence_frame(cooccurrence, dimensions=None):
+    slices = cooccurrence["slices"]
+    dimensions = [dimension for dimension in (dimensions or slices) if dimension in slices]
+    positions = np.concatenate([np.arange(slices[d].start, slices[d].stop) for d in dimensions]) \
+        if dimensions else np.array([], dtype=int)
+    names = [f"{dimension}: {value}" for dimension, value in (cooccurrence["labels"][i] for i in positions)]
+    dense = cooccurrence["matrix"][positions][:, positions].toarray()
+    return pd.DataFrame(dense, index=names, columns=names)
@@ -0,0 +1,228 @@
+import asyncio
+import html
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, unquote, urlsplit
+
+import slr
+from render import render_image
+from watch import snapshot, watched_files
+
+# Local dashboard: the review tables are loaded once and their aggregates kept in memory. They are served as JSON,
+# and the figures are rendered on demand as SVG or PNG and kept in an LRU cache. Everything is dropped when the
+# watched files change, and read again on the next request.
+
+content_types = {"json": "application/json", "html": "text/html; charset=utf-8", "svg": "image/svg+xml",
+                 "png": "image/png"}
+status_texts = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                500: "Internal Server Error"}
+
+
+class NotFound(Exception):
+    pass
+
+
+def _to_json(value):
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def _json(value):
+    return json.dumps(value, default=_to_json, ensure_ascii=False).encode("utf-8")
+
+
+class Dashboard:
+    """
+    Aggregates and figures of the review, shared by every viewer.
+
+    Loading the tables and rendering the figures run on a single worker
+    thread, so matplotlib is only used from one thread and the event loop
+    keeps answering the other requests. Viewers asking for the same figure
+    at the same time share a single rendering.
+    """
+
+    def __init__(self, config_path, cache_size=64, check_interval=1.0):
+        self.config_path = config_path
+        self.cache_size = cache_size
+        self.check_interval = check_interval
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.version = 0
+        self.stats = None
+        self.checked_at = 0.0
+        self.aggregates = None
+        self.figures = OrderedDict()
+        self.rendering = {}
+        self.lock = asyncio.Lock()
+
+    async def run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    # Reload the tables when the watched files changed, checking their modification times at most once per
+    # "check_interval" seconds
+    async def refresh(self):
+        async with self.lock:
+            if time.monotonic() - self.checked_at < self.check_interval and self.aggregates is not None:
+                return
+            self.checked_at = time.monotonic()
+            stats = snapshot(watched_files(self.config_path))
+            if stats == self.stats and self.aggregates is not None:
+                return
+            if self.stats is not None and stats.get(self.config_path) != self.stats.get(self.config_path):
+                await self.run(slr.load_config, self.config_path)
+            self.aggregates = await self.run(self.compute_aggregates)
+            self.stats = stats
+            self.version += 1
+            self.figures.clear()
+            print(f"Review tables loaded (version {self.version}, {slr.num_studies} studies)")
+
+    @staticmethod
+    def compute_aggregates():
+        slr.load_tables()
+        counts = slr.get_dimension_counts()
+        # Same counts as the stacked plots of the build, from the co-occurrence matrix
+        stacked = slr.get_stacked_counts()
+        scores = ["Study", *(f"{dimension} score" for dimension in slr.radar_dimensions)]
+        radar = slr.df_articles[[column for column in scores if column in slr.df_articles.columns]]
+        return {
+            "summary": {"num_studies": slr.num_studies, "dimensions": list(counts["dimensions"]),
+                        "stacked": [f"{dim1}|{dim2}" for dim1, dim2 in stacked],
+                        "geography": list(slr.geography_levels), "radar_dimensions": slr.radar_dimensions},
+            "dimensions": counts["dimensions"],
+            "stacked": {f"{dim1}|{dim2}": value for (dim1, dim2), value in stacked.items()},
+            "geography": slr.get_geography_counts(),
+            "radar": radar.astype(object).where(radar.notna(), None).to_dict(orient="records"),
+        }
+
+    def figure_args(self, kind, name):
+        aggregates = self.aggregates
+        num_studies = aggregates["summary"]["num_studies"]
+        if kind == "dimension" and name in aggregates["dimensions"]:
+            return "plot_graph", (name, aggregates["dimensions"][name], slr.dimensions[name][0], num_studies, None)
+        if kind == "geography" and name in aggregates["geography"]:
+            counts = aggregates["geography"][name]
+            return "plot_graph", (name, counts, slr.geography_levels[name][0], num_studies, None)
+        if kind == "stacked" and name in aggregates["stacked"]:
+            dim1, dim2 = name.split("|")
+            return "plot_freq_stacked", (dim1, dim2, aggregates["stacked"][name], num_studies, None)
+        if kind == "radar":
+            import pandas as pd
+
+            studies = [study for study in name.split(",") if study]
+            rows = [row for row in aggregates["radar"] if row["Study"] in studies] if studies else aggregates["radar"]
+            if rows:
+                return "plot_radar_overlay", (pd.DataFrame(rows), slr.radar_dimensions, None, "radar")
+        raise NotFound(f"{kind}/{name}")
+
+    async def figure(self, kind, name, image_format):
+        key = (self.version, kind, name, image_format)
+        if key in self.figures:
+            self.figures.move_to_end(key)
+            return self.figures[key]
+        if key not in self.rendering:
+            function, args = self.figure_args(kind, name)
+            self.rendering[key] = asyncio.ensure_future(self.run(render_image, function, args, image_format))
+        try:
+            image = await self.rendering[key]
+        finally:
+            self.rendering.pop(key, None)
+        if key[0] == self.version:
+            self.figures[key] = image
+            while len(self.figures) > self.cache_size:
+                self.figures.popitem(last=False)
+        return image
+
+    def index_page(self):
+        summary = self.aggregates["summary"]
+
+        def images(kind, names):
+            # Names may contain "/", "?", "#" or "%": they are percent-encoded as a single path segment
+            return "".join(f'<figure><img src="/figures/{kind}/{quote(name, safe="")}.svg" loading="lazy">'
+                           f'<figcaption>{html.escape(name)}</figcaption></figure>' for name in names)
+
+        return (f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>PySLR</title><style>"
+                f"body{{font-family:serif}} figure{{display:inline-block;margin:8px}} img{{max-width:480px}}"
+                f"</style></head><body><h1>PySLR review ({summary['num_studies']} studies)</h1>"
+                f"<h2>Dimensions</h2>{images('dimension', summary['dimensions'])}"
+                f"<h2>Stacked dimensions</h2>{images('stacked', summary['stacked'])}"
+                f"<h2>Geography</h2>{images('geography', summary['geography'])}"
+                f"<h2>Radar</h2>{images('radar', ['all'] if summary['radar_dimensions'] else [])}"
+                f"<p>JSON: <a href='/api/summary'>summary</a>, <a href='/api/dimensions'>dimensions</a>, "
+                f"<a href='/api/stacked'>stacked</a>, <a href='/api/geography'>geography</a>, "
+                f"<a href='/api/radar'>radar</a></p></body></html>").encode("utf-8")
+
+    # (content type, body) of a GET request
+    async def handle(self, path):
+        await self.refresh()
+        parts = [unquote(part) for part in urlsplit(path).path.strip("/").split("/")]
+        if parts == [""]:
+            return "html", self.index_page()
+        if len(parts) == 2 and parts[0] == "api" and parts[1] in self.aggregates:
+            return "json", _json(self.aggregates[parts[1]])
+        if len(parts) == 3 and parts[0] == "figures" and "." in parts[2]:
+            name, image_format = parts[2].rsplit(".", 1)
+            if image_format in ("svg", "png"):
+                if parts[1] == "radar" and name == "all":
+                    name = ""
+                return image_format, await self.figure(parts[1], name, image_format)
+        raise NotFound(path)
+
+
+async def _respond(writer, status, content_type=None, body=b"", etag=None, head=False):
+    headers = [f"HTTP/1.1 {status} {status_texts[status]}", f"Content-Length: {len(body)}", "Connection: close"]
+    if content_type:
+        headers.append(f"Content-Type: {content_types[content_type]}")
+    if etag:
+        headers.append(f'ETag: "{etag}"')
+        headers.append("Cache-Control: no-cache")
+    writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1"))
+    if not head:
+        writer.write(body)
+    await writer.drain()
+
+
+async def _serve_client(dashboard, reader, writer):
+    try:
+        request_line = (await reader.readline()).decode("latin-1").split()
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if len(request_line) != 3:
+            await _respond(writer, 400)
+            return
+        method, path, _ = request_line
+        if method not in ("GET", "HEAD"):
+            await _respond(writer, 405)
+            return
+        try:
+            content_type, body = await dashboard.handle(path)
+        except NotFound:
+            await _respond(writer, 404, "json", _json({"error": f"Not found: {path}"}), head=method == "HEAD")
+            return
+        except Exception as e:
+            await _respond(writer, 500, "json", _json({"error": repr(e)}), head=method == "HEAD")
+            return
+        etag = f"{dashboard.version}-{hash(path) & 0xffffffff:x}"
+        if headers.get("if-none-match") == f'"{etag}"':
+            await _respond(writer, 304, etag=etag)
+        else:
+            await _respond(writer, 200, content_type, body, etag, head=method == "HEAD")
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(config_path, host="127.0.0.1", port=8050, cache_size=64):
+    dashboard = Dashboard(config_path, cache_size)
+    await dashboard.refresh()
+    server = await asyncio.start_server(lambda reader, writer: _serve_client(dashboard, reader, writer), host, port)
+    print(f"Dashboard at http://{host}:{port}/ (Ctrl+C to stop)")
+    async with server:
+        await server.serve_forever()
@@ -0,0 +1,103 @@
+import random
+import zlib
+
+import numpy as np
+
+from bib_diff import normalize_title
+
+# Mersenne prime used for the MinHash universal hashing; small enough that a * h + b fits in 64 bits
+_prime = np.uint64((1 << 31) - 1)
+
+
+def title_shingles(title, size):
+    text = normalize_title(title)
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def make_permutations(num_perm, seed=1):
+    rng = random.Random(seed)
+    a = np.array([rng.randrange(1, _prime) for _ in range(num_perm)], dtype=np.uint64)
+    b = np.array([rng.randrange(0, _prime) for _ in range(num_perm)], dtype=np.uint64)
+    return a, b
+
+
+def minhash_signature(shingles, permutations):
+    a, b = permutations
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) % _prime for s in shingles), dtype=np.uint64,
+                         count=len(shingles))
+    return ((np.outer(hashes, a) + b) % _prime).min(axis=0)
+
+
+def jaccard(set1, set2):
+    if not set1 or not set2:
+        return 0.0
+    return len(set1 & set2) / len(set1 | set2)
+
+
+# Group entries whose signatures agree on every row of at least one band; only those pairs are compared
+def lsh_candidate_pairs(signatures, bands):
+    if not signatures:
+        return set()
+    num_perm = len(signatures[0])
+    if not 1 <= bands <= num_perm or num_perm % bands != 0:
+        raise ValueError(f"The number of bands ({bands}) must divide the number of permutations ({num_perm})")
+    rows = num_perm // bands
+    candidates = set()
+    for band in range(bands):
+        buckets = {}
+        for i, signature in enumerate(signatures):
+            buckets.setdefault(signature[band * rows:(band + 1) * rows].tobytes(), []).append(i)
+        for members in buckets.values():
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    candidates.add((members[x], members[y]))
+    return candidates
+
+
+def _find(parents, i):
+    while parents[i] != i:
+        parents[i] = parents[parents[i]]
+        i = parents[i]
+    return i
+
+
+# Given a list of titles, return the clusters (lists of indices) of likely duplicates, with the lowest
+# verified similarity of each cluster
+def find_duplicate_clusters(titles, shingle_size=3, num_perm=64, bands=16, threshold=0.8):
+    permutations = make_permutations(num_perm)
+    shingles = [title_shingles(title, shingle_size) for title in titles]
+    indexed = [i for i, s in enumerate(shingles) if s]
+    signatures = [minhash_signature(shingles[i], permutations) for i in indexed]
+
+    parents = list(range(len(titles)))
+    similarities = {}
+    for x, y in lsh_candidate_pairs(signatures, bands):
+        i, j = indexed[x], indexed[y]
+        similarity = jaccard(shingles[i], shingles[j])
+        if similarity < threshold:
+            continue
+        root_i, root_j = _find(parents, i), _find(parents, j)
+        if root_i != root_j:
+            parents[root_j] = root_i
+        similarities[(i, j)] = similarity
+
+    clusters = {}
+    for i in range(len(titles)):
+        clusters.setdefault(_find(parents, i), []).append(i)
+    cluster_similarity = {}
+    for (i, _), similarity in similarities.items():
+        root = _find(parents, i)
+        cluster_similarity[root] = min(similarity, cluster_similarity.get(root, 1.0))
+
+    return [(members, cluster_similarity[root]) for root, members in sorted(clusters.items()) if len(members) > 1]
+
+
+def write_cluster_report(clusters, entries, file_path):
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write("Cluster\tSimilarity\tDatabase\tEntry\tTitle\n")
+        for n, (members, similarity) in enumerate(clusters, start=1):
+            for i in members:
+                database, key, title = entries[i]
+                f.write(f"{n}\t{similarity:.2f}\t{database}\t{key}\t{' '.join(str(title).split())}\n")
@@ -0,0 +1,27 @@
+# Cell values as the text shown in the tables (str() of each value, so missing cells become "nan")
+def as_text(column):
+    return column.astype(object).map(str)
+
+
+# One row per value of the comma-separated dimension cells, keeping the index of the study it came from
+def split_dimension_values(column):
+    return as_text(column).str.split(",").explode().str.strip().str.replace('"', "", regex=False)
+
+
+def count_dimension_values(column, dimension):
+    counts = split_dimension_values(column).value_counts(sort=False)
+    if dimension == "Year":
+        return dict(sorted(counts.items()))
+    return dict(sorted(counts.items(), key=lambda x: x[1], reverse=True))
+
+
+# Count every configured dimension of the articles table in one go. The plotting functions take the result as
+# input. The stacked plots count pairs of dimensions from the co-occurrence matrix (see the cooccurrence module).
+def compute_dimension_counts(df_articles, dimensions):
+    counts = {"num_studies": len(df_articles.index), "dimensions": {}}
+    for dimension in dimensions:
+        if dimension not in df_articles.columns:
+            print(f"Dimension '{dimension}' is missing. Skipping.")
+            continue
+        counts["dimensions"][dimension] = count_dimension_values(df_articles[dimension], dimension)
+    return counts
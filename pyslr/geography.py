@@ -0,0 +1,23 @@
+from dimension_counts import as_text
+
+
+# Number of distinct studies per value of each geography level, as a (Level, Value, Studies) table
+def geography_table(df_authors, levels):
+    levels = [level for level in levels if level in df_authors.columns]
+    pairs = df_authors[["Study", *levels]].melt(id_vars="Study", var_name="Level", value_name="Value")
+    pairs["Value"] = as_text(pairs["Value"])
+    pairs = pairs.drop_duplicates()
+    return pairs.groupby(["Level", "Value"], sort=False).size().reset_index(name="Studies")
+
+
+# Same counts as geography_table, as {level: {value: studies}} sorted by ascending frequency
+def compute_geography_counts(df_authors, levels):
+    table = geography_table(df_authors, levels)
+    counts = {}
+    for level in levels:
+        if level not in df_authors.columns:
+            print(f"Geography level '{level}' is missing. Skipping.")
+            continue
+        rows = table[table["Level"] == level]
+        counts[level] = dict(sorted(zip(rows["Value"], rows["Studies"].astype(int)), key=lambda x: x[1]))
+    return counts
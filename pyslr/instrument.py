@@ -0,0 +1,165 @@
+import functools
+import json
+import os
+import time
+from contextlib import contextmanager
+
+# Instrumentation of the pipeline: nested timing spans with row and figure counts, and optionally the peak
+# traced memory of each span and a cProfile capture of the whole run. Everything is off until configured.
+enabled = False
+profile = False
+trace_memory = False
+
+_spans = []
+_stack = []
+_profiler = None
+
+
+def configure(timings=False, profile_run=False, memory=False):
+    global enabled, profile, trace_memory
+    enabled = bool(timings or profile_run or memory)
+    profile = bool(profile_run)
+    trace_memory = bool(memory)
+
+
+def reset():
+    global _profiler
+    _spans.clear()
+    _stack.clear()
+    _profiler = None
+
+
+def _new_span(name, seconds=0.0, counts=None):
+    return {"name": name, "seconds": seconds, "counts": dict(counts or {}), "peak_mb": None, "children": []}
+
+
+def _add_span(span):
+    if _stack:
+        _stack[-1]["children"].append(span)
+    else:
+        _spans.append(span)
+
+
+def _start_profiling():
+    global _profiler
+    import cProfile
+
+    if _profiler is None:
+        _profiler = cProfile.Profile()
+    _profiler.enable()
+
+
+# Peak traced memory is reset at the start of every span, so the peak reached by a span before one of its
+# children starts is kept in "_peak" and merged back when the child ends
+def _enter_memory(span):
+    import tracemalloc
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if _stack:
+        parent = _stack[-1]
+        parent["_peak"] = max(parent.get("_peak", 0), tracemalloc.get_traced_memory()[1])
+    tracemalloc.reset_peak()
+    span["_peak"] = 0
+
+
+def _exit_memory(span):
+    import tracemalloc
+
+    peak = max(span.pop("_peak"), tracemalloc.get_traced_memory()[1])
+    span["peak_mb"] = round(peak / 2 ** 20, 2)
+    if _stack:
+        _stack[-1]["_peak"] = max(_stack[-1].get("_peak", 0), peak)
+    else:
+        tracemalloc.stop()
+
+
+@contextmanager
+def span(name, **counts):
+    if not enabled:
+        yield None
+        return
+
+    current = _new_span(name, counts=counts)
+    _add_span(current)
+    if profile and not _stack:
+        _start_profiling()
+    if trace_memory:
+        _enter_memory(current)
+    _stack.append(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current["seconds"] = time.perf_counter() - start
+        _stack.pop()
+        if trace_memory:
+            _exit_memory(current)
+        if profile and not _stack:
+            _profiler.disable()
+
+
+# Decorator running a function inside a span named after it. The given counts are added on every call.
+def traced(name=None, **counts):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            with span(name or function.__name__, **counts):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Add to a count ("rows", "figures"...) of the innermost span
+def count(key, n=1):
+    if enabled and _stack:
+        counts = _stack[-1]["counts"]
+        counts[key] = counts.get(key, 0) + n
+
+
+# Add a span that was timed elsewhere, e.g. a figure rendered by a worker process
+def record(name, seconds, **counts):
+    if enabled:
+        _add_span(_new_span(name, seconds, counts))
+
+
+def _flatten(spans, depth=0):
+    for item in spans:
+        yield depth, item
+        yield from _flatten(item["children"], depth + 1)
+
+
+def print_summary(top=15):
+    if not _spans:
+        return
+    rows = list(_flatten(_spans))
+    width = max([2 * depth + len(item["name"]) for depth, item in rows] + [4])
+    print(f"{'Span':<{width}}  Time (s)      Rows  Figures  Peak (MB)")
+    for depth, item in rows:
+        name = "  " * depth + item["name"]
+        rows_count = item["counts"].get("rows", "")
+        figures = item["counts"].get("figures", "")
+        peak = "" if item["peak_mb"] is None else f"{item['peak_mb']:.1f}"
+        print(f"{name:<{width}}  {item['seconds']:8.3f}  {rows_count:>8}  {figures:>7}  {peak:>9}")
+
+    if _profiler is not None:
+        import pstats
+
+        print(f"\nTop {top} functions by cumulative time:")
+        pstats.Stats(_profiler).sort_stats("cumulative").print_stats(top)
+
+
+def _public(item):
+    return {"name": item["name"], "seconds": round(item["seconds"], 6), "counts": item["counts"],
+            "peak_mb": item["peak_mb"], "children": [_public(child) for child in item["children"]]}
+
+
+# Write the spans as JSON, and the cProfile statistics next to it (same name, .prof extension)
+def write_trace(file_path):
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    with open(file_path, 'w') as f:
+        json.dump({"spans": [_public(item) for item in _spans]}, f, indent=2)
+    if _profiler is not None:
+        _profiler.dump_stats(os.path.splitext(file_path)[0] + ".prof")
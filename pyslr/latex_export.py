@@ -0,0 +1,124 @@
+from dimension_counts import as_text, split_dimension_values
+
+# Characters escaped in the text cells of the tables
+_escape_table = str.maketrans({"&": "\\&", "%": "\\%"})
+
+# With "latex_longtable": "auto", tables with more rows than this are written as a longtable, which LaTeX can
+# split across pages
+longtable_threshold = 50
+
+
+def get_word_acronym(word):
+    if word == "N/A" or word == '"N/A"':
+        return "-"
+    elif len(word) <= 2 or word.isupper():
+        return word.upper()
+    else:
+        return word.upper()[0]
+
+
+def get_value_acronym(dimension_value):
+    words = dimension_value.replace("-", " ").split()
+    if not words:
+        return "-"
+    if len(words) > 1:
+        return "".join(get_word_acronym(word) for word in words)
+    return get_word_acronym(words[0])
+
+
+# Assign an acronym to each value of a dimension. Values are processed in sorted order, so the
+# acronyms do not depend on the order of the rows. A colliding acronym gets the next letters of
+# its value appended, then a number.
+def assign_acronyms(values):
+    acronyms = {}
+    used = set()
+    for value in sorted(values):
+        base = get_value_acronym(value)
+        acronym = base
+        letters = iter(value[1:].replace(" ", "").lower())
+        suffix = 1
+        while acronym in used and acronym != "-":
+            letter = next(letters, None)
+            if letter is not None:
+                acronym += letter
+            else:
+                suffix += 1
+                acronym = f"{base}{suffix}"
+        used.add(acronym)
+        acronyms[value] = acronym
+    return acronyms
+
+
+def _dimension_values(df, dimension):
+    return split_dimension_values(df[dimension].astype(object).fillna("N/A"))
+
+
+# Build the acronym dictionary of every dimension in one pass over each column
+def compute_acronyms(df, dimensions):
+    return {dimension: assign_acronyms(_dimension_values(df, dimension).unique()) for dimension in dimensions}
+
+
+# Tables are a tabular unless longtable is opted in: a longtable cannot be placed in a table float and needs
+# \usepackage{longtable}
+def use_longtable(num_rows, longtable):
+    if longtable == "auto":
+        return num_rows > longtable_threshold
+    return bool(longtable)
+
+
+def _table_lines(column_format, header, rows, longtable):
+    if longtable:
+        yield f"\\begin{{longtable}}{{{column_format}}}\n"
+        yield "\\toprule\n"
+        yield header
+        yield "\\midrule\n"
+        yield "\\endfirsthead\n"
+        yield "\\toprule\n"
+        yield header
+        yield "\\midrule\n"
+        yield "\\endhead\n"
+        yield "\\bottomrule\n"
+        yield "\\endlastfoot\n"
+        yield from rows
+        yield "\\end{longtable}\n"
+    else:
+        yield f"\\begin{{tabular}}{{{column_format}}}\n"
+        yield "\\toprule\n"
+        yield header
+        yield "\\midrule\n"
+        yield from rows
+        yield "\\bottomrule\n"
+        yield "\\end{tabular}\n"
+
+
+def information_rows(df):
+    titles = as_text(df['Title']).str.translate(_escape_table)
+    publications = as_text(df['Publication']).str.translate(_escape_table)
+    for study, year, citation, title, publication in zip(as_text(df['Study']), as_text(df['Year']),
+                                                         as_text(df['Citation']), titles, publications):
+        yield f"{study} & {year} & \\cite{{{citation}}} & {title} & {publication} \\\\[0.2cm]\n"
+
+
+def summary_rows(df, dimensions, acronyms):
+    columns = [as_text(df['Citation']).map(lambda citation: f"\\cite{{{citation}}}")]
+    for dimension in dimensions:
+        row_acronyms = _dimension_values(df, dimension).map(acronyms[dimension])
+        columns.append(row_acronyms.groupby(level=0, sort=False).agg(lambda x: ", ".join(sorted(x))))
+    for cells in zip(*columns):
+        yield " & ".join(cells) + " \\\\[0.2cm]\n"
+
+
+def write_information_table(df, file_path, longtable=False):
+    header = "Study & Year & Citation & Title & Publication \\\\[0.1cm]\n"
+    with open(file_path, 'w') as f:
+        f.writelines(_table_lines("lllll", header, information_rows(df), use_longtable(len(df.index), longtable)))
+
+
+def write_summary_table(df, dimensions, file_path, longtable=False):
+    dimensions = list(dimensions)
+    acronyms = compute_acronyms(df, dimensions)
+    header = "Study & " + " & ".join(dimensions) + "\\\\[0.1cm]\n"
+    with open(file_path, 'w') as f:
+        f.writelines(_table_lines("l" * (len(dimensions) + 1), header, summary_rows(df, dimensions, acronyms),
+                                  use_longtable(len(df.index), longtable)))
+    return acronyms
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+import plots
+import radar_chart
+import render
+
+manifest_file_name = ".manifest.json"
+
+# The rcParams that change with the way figures are shown, not with their content
+_ignored_rc_params = ("backend", "backend_fallback", "interactive")
+
+
+def _update_digest(digest, value):
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr(list(value.columns)).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, dict):
+        digest.update(b"{")
+        for key, item in value.items():
+            _update_digest(digest, key)
+            _update_digest(digest, item)
+        digest.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"[")
+        for item in value:
+            _update_digest(digest, item)
+        digest.update(b"]")
+    else:
+        digest.update(repr(value).encode("utf-8"))
+        digest.update(b";")
+
+
+def code_version():
+    digest = hashlib.sha1()
+    for module in (plots, radar_chart, render):
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def rc_params_version():
+    rc_params = {key: value for key, value in plt.rcParams.items() if key not in _ignored_rc_params}
+    return hashlib.sha1(repr(sorted(rc_params.items())).encode("utf-8")).hexdigest()
+
+
+# Content hash of everything a figure depends on: its plotting function and inputs, the rcParams and the code
+def job_digest(job, versions):
+    digest = hashlib.sha1()
+    _update_digest(digest, (versions, job.function, job.args))
+    return digest.hexdigest()
+
+
+def load_manifest(manifest_path):
+    try:
+        with open(manifest_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, manifest_path):
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+# Split the jobs into the ones whose figure is missing or was built from other inputs, and the up-to-date ones.
+# Returns the stale jobs and the digest of every job.
+def find_stale_jobs(jobs, manifest):
+    versions = (code_version(), rc_params_version())
+    digests = {job.output: job_digest(job, versions) for job in jobs}
+    stale = [job for job in jobs
+             if manifest.get(job.output) != digests[job.output] or not os.path.exists(job.output)]
+    return stale, digests
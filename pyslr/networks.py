@@ -0,0 +1,127 @@
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from dimension_counts import as_text
+
+# Collaboration networks of the review. Each network starts from a sparse study x item incidence matrix (items are
+# authors, institutions, countries...): its product with itself gives, for every pair of items, the number of
+# studies they share, without looping over the pairs of each study.
+
+# Placeholders of the cells the reviewers did not fill in
+missing_values = {"", "nan", "none", "blank", "n/a", "-"}
+
+
+# Sparse binary study x item matrix of the (study, item) pairs, with the labels of its rows and columns
+def incidence_matrix(studies, items):
+    pairs = pd.DataFrame({"Study": as_text(pd.Series(studies)).to_numpy(),
+                          "Item": as_text(pd.Series(items)).str.strip().to_numpy()})
+    pairs = pairs[~pairs["Item"].str.casefold().isin(missing_values)].drop_duplicates()
+    study_codes, study_labels = pd.factorize(pairs["Study"])
+    item_codes, item_labels = pd.factorize(pairs["Item"])
+    matrix = sparse.csr_matrix((np.ones(len(pairs.index), dtype=np.int32), (study_codes, item_codes)),
+                               shape=(len(study_labels), len(item_labels)))
+    return matrix, list(study_labels), list(item_labels)
+
+
+# Incidence of the authors of each study, from the "#"-joined Authors column of the articles table
+def author_incidence(df_articles):
+    authors = as_text(df_articles["Authors"]).str.split("#")
+    exploded = pd.DataFrame({"Study": df_articles["Study"].to_numpy(), "Author": authors.to_numpy()})
+    exploded = exploded.explode("Author")
+    return incidence_matrix(exploded["Study"], exploded["Author"])
+
+
+# Incidence of the values of a column of the authors table (Institution, Country...) in each study
+def level_incidence(df_authors, level):
+    return incidence_matrix(df_authors["Study"], df_authors[level])
+
+
+# Item x item matrix of the number of studies shared by each pair of items. The diagonal holds the number of
+# studies of each item.
+def co_occurrence(incidence):
+    incidence = incidence.astype(np.int32)
+    return (incidence.T @ incidence).tocsr()
+
+
+def _pairs(co_matrix):
+    upper = sparse.triu(co_matrix, k=1).tocoo()
+    return upper.row, upper.col, upper.data
+
+
+# The pairs of items sharing the most studies
+def top_pairs(co_matrix, labels, top=20):
+    rows, cols, counts = _pairs(co_matrix)
+    order = np.lexsort((cols, rows, -counts))[:top]
+    return pd.DataFrame({"Item 1": [labels[i] for i in rows[order]], "Item 2": [labels[j] for j in cols[order]],
+                         "Studies": counts[order].astype(int)})
+
+
+# Studies and collaborators (items sharing at least one study) of every item, most collaborative first
+def item_table(co_matrix, labels):
+    studies = co_matrix.diagonal()
+    links = co_matrix.copy()
+    links.setdiag(0)
+    links.eliminate_zeros()
+    collaborators = np.diff(links.indptr)
+    table = pd.DataFrame({"Item": labels, "Studies": studies.astype(int), "Collaborators": collaborators})
+    return table.sort_values(["Collaborators", "Studies"], ascending=False, kind="stable").reset_index(drop=True)
+
+
+# Connected components of the collaboration graph, largest first: number of items and studies, and members
+def component_table(incidence, co_matrix, labels):
+    num_components, component_of = connected_components(co_matrix, directed=False)
+    membership = sparse.csr_matrix((np.ones(len(labels), dtype=np.int32), (np.arange(len(labels)), component_of)),
+                                   shape=(len(labels), num_components))
+    studies = np.asarray(((incidence @ membership) > 0).sum(axis=0)).ravel()
+    sizes = np.bincount(component_of, minlength=num_components)
+    members = [[] for _ in range(num_components)]
+    for label, component in zip(labels, component_of):
+        members[component].append(label)
+    table = pd.DataFrame({"Items": sizes, "Studies": studies.astype(int),
+                          "Members": ["; ".join(member) for member in members]})
+    table = table.sort_values(["Items", "Studies"], ascending=False, kind="stable").reset_index(drop=True)
+    table.insert(0, "Component", range(1, num_components + 1))
+    return table
+
+
+# Square matrix of the studies shared by the "top" items with the most studies, as a labelled DataFrame
+def co_occurrence_frame(co_matrix, labels, top=15):
+    order = np.argsort(-co_matrix.diagonal(), kind="stable")[:top]
+    dense = co_matrix[order][:, order].toarray()
+    names = [labels[i] for i in order]
+    return pd.DataFrame(dense, index=names, columns=names)
+
+
+# Every table of one network: {"pairs", "items", "components", "matrix"}
+def analyse_network(incidence, labels, top=20):
+    co_matrix = co_occurrence(incidence)
+    return {"pairs": top_pairs(co_matrix, labels, top),
+            "items": item_table(co_matrix, labels),
+            "components": component_table(incidence, co_matrix, labels),
+            "matrix": co_occurrence_frame(co_matrix, labels, min(top, 15))}
+
+
+# Networks of the authors (from the articles table) and of the given levels of the authors table
+def compute_networks(df_articles, df_authors, levels, top=20):
+    networks = {}
+    for level in levels:
+        if level == "Author" and "Authors" in df_articles.columns:
+            incidence, _, labels = author_incidence(df_articles)
+        elif level in df_authors.columns:
+            incidence, _, labels = level_incidence(df_authors, level)
+        else:
+            print(f"Network level '{level}' is missing. Skipping.")
+            continue
+        networks[level] = analyse_network(incidence, labels, top)
+    return networks
+
+
+def write_network_tables(networks, folder):
+    os.makedirs(folder, exist_ok=True)
+    for level, network in networks.items():
+        for table in ("pairs", "items", "components"):
+            network[table].to_csv(os.path.join(folder, f"{level}_{table}.tsv"), sep="\t", index=False)
@@ -0,0 +1,165 @@
+import os
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.ticker import MaxNLocator
+
+from instrument import traced
+
+style = {'font.family': 'serif',
+         'font.sans-serif': ['Century'],
+         'font.size': 8}
+
+
+def apply_style():
+    plt.rcParams.update(style)
+
+
+def figure_path(root_dir, name):
+    return os.path.join(root_dir, "figures", f"{name}.pdf")
+
+
+# Save a figure to the figures folder. Without a root folder, the figure is only drawn (the dashboard renders it
+# to memory instead).
+def save_figure(fig, root_dir, name):
+    if root_dir is not None:
+        fig.savefig(figure_path(root_dir, name), format="pdf", bbox_inches="tight")
+
+
+# Graph functions
+@traced(figures=1)
+def plot_line(dimension, dim_count_dict, num_studies, root_dir):
+    fig, ax = plt.subplots()
+    labels = [value.replace(" ", "\n") for value in list(dim_count_dict.keys())]
+    bars = ax.plot(labels, dim_count_dict.values())
+    ax.set_title(f"{dimension} frequency chart (n = {num_studies} studies)")
+    if len(dim_count_dict) > 6:
+        plt.xticks(rotation=35)
+    ax.set_xlabel(f"{dimension}")
+    ax.set_ylabel("Frequency")
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.set_axisbelow(True)
+    ax.yaxis.set_major_locator(MaxNLocator(integer=True))
+    plt.grid(axis='y')
+    save_figure(fig, root_dir, f"{dimension}_freq")
+    return fig
+
+
+@traced(figures=1)
+def plot_freq(dimension, dim_count_dict, num_studies, root_dir):
+    fig, ax = plt.subplots()
+    labels = [value.replace(" ", "\n") for value in list(dim_count_dict.keys())]
+    bars = ax.bar(labels, dim_count_dict.values())
+    ax.bar_label(bars)
+    ax.set_title(f"{dimension} frequency chart (n = {num_studies} studies)")
+    if len(dim_count_dict) > 6:
+        plt.xticks(rotation=35)
+    if len(dim_count_dict) <= 3:
+        ax.set_aspect(0.3)
+    ax.set_xlabel(f"{dimension}")
+    ax.set_ylabel("Frequency")
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.set_axisbelow(True)
+    ax.yaxis.set_major_locator(MaxNLocator(integer=True))
+    plt.grid(axis='y')
+    save_figure(fig, root_dir, f"{dimension}_freq")
+    return fig
+
+
+@traced(figures=1)
+def plot_freq_stacked(dimension, stacked_dimension, dim_count_dict, num_studies, root_dir):
+    fig, ax = plt.subplots()
+    x = list(dim_count_dict.keys())
+    y_labels = list(dim_count_dict[x[0]].keys())
+    y_list = [[] for _ in y_labels]
+    ax.set_title(f"{dimension} and {stacked_dimension} frequency chart (n = {num_studies} studies)")
+
+    for i, label in enumerate(y_labels):
+        for key, item in dim_count_dict.items():
+            y_list[i].append(item[label])
+
+    y_list = [np.array(x) for x in y_list]
+
+    bottom = np.zeros(len(x))
+    bars = None
+    for y in y_list:
+        bars = ax.bar(x, y, bottom=bottom)
+        labels = [f"{int(bar.get_height())}" if bar.get_height() > 0.2 else '' for bar in bars]
+        ax.bar_label(bars, labels=labels, label_type='center', color='white')
+        bottom += y
+    ax.bar_label(bars)
+
+    ax.legend(y_labels)
+    ax.set_xlabel(f"{dimension}")
+    ax.set_ylabel("Frequency")
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.set_axisbelow(True)
+    ax.yaxis.set_major_locator(MaxNLocator(integer=True))
+    plt.grid(axis='y')
+    save_figure(fig, root_dir, f"{dimension}_{stacked_dimension}_freq")
+    return fig
+
+
+@traced(figures=1)
+def plot_freq_h(dimension, dim_count_dict, num_studies, root_dir):
+    fig, ax = plt.subplots()
+    bars = ax.barh(list(dim_count_dict.keys()), dim_count_dict.values())
+    ax.bar_label(bars)
+    ax.set_title(f"{dimension} frequency chart (n = {num_studies} studies)")
+    ax.set_ylabel(f"{dimension}")
+    ax.set_xlabel("Frequency")
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.set_axisbelow(True)
+    ax.xaxis.set_major_locator(MaxNLocator(integer=True))
+    plt.grid(axis='x')
+    save_figure(fig, root_dir, f"{dimension}_freq")
+    return fig
+
+
+@traced(figures=1)
+def plot_pie(dimension, data_dict, num_studies, root_dir):
+    fig, ax = plt.subplots()
+    ax.pie(data_dict.values(), labels=[f"{label} ({data_dict[label]})" for label in data_dict.keys()],
+           autopct='%1.0f%%')
+    ax.set_title(f"{dimension} frequency chart (n = {num_studies} studies)")
+    centre_circle = plt.Circle((0, 0), 0.70, fc='white')
+    fig = plt.gcf()
+
+    # Adding Circle in Pie chart
+    fig.gca().add_artist(centre_circle)
+    save_figure(fig, root_dir, f"{dimension}_freq")
+    return fig
+
+
+# Heatmap of a square DataFrame, such as the number of studies shared by each pair of authors or countries.
+# Cells are annotated with their count when the matrix has at most "annotate" columns.
+@traced(figures=1)
+def plot_heatmap(name, matrix, num_studies, root_dir, annotate=30):
+    fig, ax = plt.subplots(figsize=(max(6, 0.4 * len(matrix.columns)), max(5, 0.35 * len(matrix.index))))
+    image = ax.imshow(matrix.to_numpy(), cmap="Blues")
+    ax.set_xticks(range(len(matrix.columns)), labels=matrix.columns, rotation=60, ha="right")
+    ax.set_yticks(range(len(matrix.index)), labels=matrix.index)
+    if len(matrix.columns) <= annotate:
+        for (i, j), value in np.ndenumerate(matrix.to_numpy()):
+            if value:
+                ax.text(j, i, int(value), ha="center", va="center", fontsize=6)
+    ax.set_title(f"{name} (n = {num_studies} studies)")
+    fig.colorbar(image, ax=ax, label="Studies")
+    save_figure(fig, root_dir, f"{name}_heatmap")
+    return fig
+
+
+@traced()
+def plot_graph(dimension, data_dict, graph_type, num_studies, root_dir):
+    if graph_type == "B":
+        return plot_freq(dimension, data_dict, num_studies, root_dir)
+    elif graph_type == "BH":
+        return plot_freq_h(dimension, data_dict, num_studies, root_dir)
+    elif graph_type == "P":
+        return plot_pie(dimension, data_dict, num_studies, root_dir)
+    elif graph_type == "L":
+        return plot_line(dimension, data_dict, num_studies, root_dir)
@@ -1,8 +1,7 @@
-import math
-
 import matplotlib.pyplot as plt
 import numpy as np
 
+from matplotlib.backends.backend_pdf import PdfPages
 from matplotlib.patches import Circle, RegularPolygon
 from matplotlib.path import Path
 from matplotlib.projections import register_projection
@@ -11,12 +10,18 @@ from matplotlib.spines import Spine
 from matplotlib.transforms import Affine2D
 import os
 
+from instrument import traced, count
+
+# The (num_vars, frame) of the registered RadarAxes projection, and its axis angles
+_registered_radar = {}
+
 
 def radar_factory(num_vars, frame='circle'):
     """
     Create a radar chart with `num_vars` Axes.
 
-    This function creates a RadarAxes projection and registers it.
+    This function creates a RadarAxes projection and registers it. The projection
+    is only created again when `num_vars` or `frame` change.
 
     Parameters
     ----------
@@ -26,6 +31,9 @@ def radar_factory(num_vars, frame='circle'):
         Shape of frame surrounding Axes.
 
     """
+    if _registered_radar.get("key") == (num_vars, frame):
+        return _registered_radar["theta"]
+
     # calculate evenly-spaced axis angles
     theta = np.linspace(0, 2*np.pi, num_vars, endpoint=False)
 
@@ -58,6 +66,7 @@ def radar_factory(num_vars, frame='circle'):
             lines = super().plot(*args, **kwargs)
             for line in lines:
                 self._close_line(line)
+            return lines
 
         def _close_line(self, line):
             x, y = line.get_data()
@@ -99,6 +108,7 @@ def radar_factory(num_vars, frame='circle'):
                 raise ValueError("Unknown value for 'frame': %s" % frame)
 
     register_projection(RadarAxes)
+    _registered_radar.update(key=(num_vars, frame), theta=theta)
     return theta
 
 
@@ -119,37 +129,186 @@ def plot_radar(x, y, title=""):
     ax.set_varlabels(spoke_labels)
 
 
-def plot_radar_many(df, dimensions, root_dir, filename):
+# Outer limit of the radars: the highest score, or 1 when there is no score or every score is 0
+def max_radar_score(scores):
+    if not scores.size or np.isnan(scores).all():
+        return 1
+    return np.nanmax(scores) or 1
+
+
+@traced(figures=1)
+def plot_radar_pages(df, dimensions, root_dir, filename, nrows=4, ncols=6):
+    """
+    Plot one radar per study on pages of `nrows` x `ncols` radars, saved as a
+    single multi-page PDF.
+
+    The grid of Axes is laid out once and reused for every page: only the
+    data and titles of the radars change between pages.
+    """
     theta = radar_factory(len(dimensions), frame='circle')
     labels = [value.replace(" ", "\n") for value in dimensions]
-    nrows = int(math.sqrt(len(df.index)))
-    ncols = nrows+2
-    print(nrows)
-    print(ncols)
-    fig, axs = plt.subplots(figsize=(13, 8), subplot_kw=dict(projection='radar'), nrows=nrows, ncols=ncols)
-    #fig.subplots_adjust(wspace=0.1, hspace=0.01, top=0.05, bottom=0.04)
-    plot_col = 0
-    plot_row = 0
-    for index, row in df.iterrows():
-        if plot_col == ncols:
-            plot_col = 0
-            plot_row += 1
-        values = []
-        for dim in dimensions:
-            values.append(row[f"{dim} score"])
-
-        ax = axs[plot_row, plot_col]
-        ax.set_title(row["Study"])
-        ax.plot(theta, values)
-        ax.fill(theta, values, alpha=0.25, label='_nolegend_')
+    scores = df[[f"{dim} score" for dim in dimensions]].to_numpy(dtype=float)
+    studies = list(df["Study"])
+    closed_theta = np.append(theta, theta[0])
+    max_score = max_radar_score(scores)
+
+    fig, axs = plt.subplots(figsize=(13, 8), subplot_kw=dict(projection='radar'), nrows=nrows, ncols=ncols,
+                            squeeze=False)
+    axs = axs.ravel()
+    radars = []
+    for ax in axs:
+        line, = ax.plot(theta, np.zeros(len(theta)))
+        patch, = ax.fill(theta, np.zeros(len(theta)), alpha=0.25, label='_nolegend_')
         ax.set_varlabels(labels)
-        plot_col += 1
+        ax.set_ylim(0, max_score)
+        ax.set_title(" ")
+        radars.append((ax, line, patch))
+    fig.tight_layout()
 
-    num_empty_plots = (nrows * ncols) - len(df.index)
+    per_page = nrows * ncols
+    with PdfPages(os.path.join(root_dir, "figures", f"{filename}.pdf")) as pdf:
+        for start in range(0, max(len(studies), 1), per_page):
+            for i, (ax, line, patch) in enumerate(radars):
+                if start + i >= len(studies):
+                    ax.set_visible(False)
+                    continue
+                values = np.append(scores[start + i], scores[start + i][0])
+                line.set_data(closed_theta, values)
+                patch.set_xy(np.column_stack([closed_theta, values]))
+                ax.set_title(studies[start + i])
+                ax.set_visible(True)
+            pdf.savefig(fig)
+            count("pages")
+    return fig
 
-    for i in range(1, num_empty_plots+1):
-      axs[-1][-i].set_axis_off()
 
-    fig.tight_layout()
-    plt.savefig(os.path.join(root_dir, f"figures\\{filename}.pdf"), format="pdf")
-    plt.show()
+def radar_vertices(scores, num_vars, max_score, radius=1.0):
+    """
+    Closed polygon vertices of one radar per row of `scores`.
+
+    The first variable points up and the others follow counterclockwise, as
+    in RadarAxes. Returns an array of shape (rows, num_vars + 1, 2) centered
+    at (0, 0), with missing scores drawn at the center.
+    """
+    angles = np.pi / 2 + np.linspace(0, 2 * np.pi, num_vars, endpoint=False)
+    directions = np.column_stack([np.cos(angles), np.sin(angles)])
+    radii = np.nan_to_num(scores / max_score) * radius if max_score else np.zeros_like(scores)
+    vertices = radii[:, :, None] * directions[None, :, :]
+    return np.concatenate([vertices, vertices[:, :1]], axis=1)
+
+
+def _radar_frames(centers, num_vars, radius, rings=4):
+    """Segments of the rings and spokes of a radar at each of `centers`."""
+    circle = np.linspace(0, 2 * np.pi, 65)
+    unit_circle = np.column_stack([np.cos(circle), np.sin(circle)])
+    angles = np.pi / 2 + np.linspace(0, 2 * np.pi, num_vars, endpoint=False)
+    tips = radius * np.column_stack([np.cos(angles), np.sin(angles)])
+    segments = []
+    for center in centers:
+        segments.extend(center + unit_circle * radius * ring / rings for ring in range(1, rings + 1))
+        segments.extend(np.array([center, center + tip]) for tip in tips)
+    return segments
+
+
+def _radar_labels(ax, centers, labels, radius, fontsize):
+    """Variable labels around each radar at `centers`."""
+    angles = np.pi / 2 + np.linspace(0, 2 * np.pi, len(labels), endpoint=False)
+    texts = []
+    for center in centers:
+        for label, angle in zip(labels, angles):
+            x, y = center + 1.15 * radius * np.array([np.cos(angle), np.sin(angle)])
+            ha = "center" if abs(np.cos(angle)) < 0.1 else ("left" if np.cos(angle) > 0 else "right")
+            texts.append(ax.text(x, y, label, ha=ha, va="center", fontsize=fontsize))
+    return texts
+
+
+@traced(figures=1)
+def plot_radar_grid(df, dimensions, root_dir, filename, nrows=4, ncols=6):
+    """
+    Plot one radar per study on pages of `nrows` x `ncols` radars, saved as a
+    single multi-page PDF, like `plot_radar_pages`.
+
+    Instead of one polar Axes per study, every radar of a page is drawn in a
+    single Axes: the polygons of all the studies are one PolyCollection, their
+    outlines and the rings and spokes of the frames are LineCollections, and
+    the vertices of every polygon are computed at once from the score matrix.
+    """
+    from matplotlib.collections import LineCollection, PolyCollection
+
+    labels = [value.replace(" ", "\n") for value in dimensions]
+    scores = df[[f"{dim} score" for dim in dimensions]].to_numpy(dtype=float)
+    studies = list(df["Study"])
+    max_score = max_radar_score(scores)
+    # Radar i of a page is centered in cell (i // ncols, i % ncols) of a grid of 3 x 3 units per radar, leaving
+    # room around each radar for its variable labels and title
+    cell = 3.0
+    radius = 0.7
+    vertices = radar_vertices(scores, len(dimensions), max_score, radius)
+    grid = np.array([((i % ncols) * cell, -(i // ncols) * cell) for i in range(nrows * ncols)])
+
+    fig, ax = plt.subplots(figsize=(13, 8))
+    fig.subplots_adjust(left=0.01, right=0.99, bottom=0.01, top=0.97)
+    ax.set_axis_off()
+    ax.set_aspect("equal")
+    ax.set_xlim(-cell / 2, (ncols - 0.5) * cell)
+    ax.set_ylim(-(nrows - 0.5) * cell, cell / 2)
+    frames = ax.add_collection(LineCollection([], colors="0.8", linewidths=0.4))
+    polygons = ax.add_collection(PolyCollection([], facecolors="C0", alpha=0.25, edgecolors="none"))
+    outlines = ax.add_collection(LineCollection([], colors="C0", linewidths=1))
+    texts = []
+
+    per_page = nrows * ncols
+    with PdfPages(os.path.join(root_dir, "figures", f"{filename}.pdf")) as pdf:
+        for start in range(0, max(len(studies), 1), per_page):
+            page = slice(start, min(start + per_page, len(studies)))
+            centers = grid[:page.stop - page.start]
+            page_vertices = vertices[page] + centers[:, None, :]
+            frames.set_segments(_radar_frames(centers, len(dimensions), radius))
+            polygons.set_verts(list(page_vertices))
+            outlines.set_segments(list(page_vertices))
+            for text in texts:
+                text.remove()
+            texts = _radar_labels(ax, centers, labels, radius, 5)
+            texts.extend(ax.text(x, y + 1.3 * radius + 0.25, study, ha="center", va="bottom", fontsize=8)
+                         for (x, y), study in zip(centers, studies[page]))
+            pdf.savefig(fig)
+            count("pages")
+    return fig
+
+
+@traced(figures=1)
+def plot_radar_overlay(df, dimensions, root_dir, filename, legend_limit=12):
+    """
+    Plot the radars of every study of `df` on a single radar, to compare them.
+
+    Polygons and outlines are drawn as one PolyCollection and one
+    LineCollection, with one color per study. Studies are named in a legend
+    when there are at most `legend_limit` of them.
+    """
+    from matplotlib.collections import LineCollection, PolyCollection
+    from matplotlib.lines import Line2D
+
+    labels = [value.replace(" ", "\n") for value in dimensions]
+    scores = df[[f"{dim} score" for dim in dimensions]].to_numpy(dtype=float)
+    studies = list(df["Study"])
+    max_score = max_radar_score(scores)
+    vertices = radar_vertices(scores, len(dimensions), max_score)
+    colors = plt.get_cmap("tab20" if len(studies) > 10 else "tab10")(np.arange(len(studies)) % 20)
+
+    fig, ax = plt.subplots(figsize=(8, 8))
+    ax.set_axis_off()
+    ax.set_aspect("equal")
+    ax.set_xlim(-1.6, 1.6)
+    ax.set_ylim(-1.6, 1.6)
+    ax.add_collection(LineCollection(_radar_frames(np.zeros((1, 2)), len(dimensions), 1.0), colors="0.8",
+                                     linewidths=0.5))
+    ax.add_collection(PolyCollection(list(vertices), facecolors=colors, alpha=min(0.25, 5 / max(len(studies), 1)),
+                                     edgecolors="none"))
+    ax.add_collection(LineCollection(list(vertices), colors=colors, linewidths=1))
+    _radar_labels(ax, np.zeros((1, 2)), labels, 1.0, 8)
+    ax.set_title(f"{len(studies)} studies")
+    if len(studies) <= legend_limit:
+        ax.legend([Line2D([], [], color=color) for color in colors], studies, loc="upper right", fontsize=7)
+    if root_dir is not None:
+        fig.savefig(os.path.join(root_dir, "figures", f"{filename}.pdf"), format="pdf", bbox_inches="tight")
+    return fig
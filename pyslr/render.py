@@ -0,0 +1,79 @@
+import io
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import matplotlib.pyplot as plt
+
+import instrument
+import plots
+import radar_chart
+
+# A figure to render: "function" names a function of the plots or radar_chart modules, called with "args",
+# that saves the figure to the "output" file
+RenderJob = namedtuple("RenderJob", ["name", "function", "args", "output"])
+
+
+def _get_function(name):
+    if hasattr(plots, name):
+        return getattr(plots, name)
+    return getattr(radar_chart, name)
+
+
+def use_headless_backend():
+    matplotlib.use("Agg")
+    plots.apply_style()
+
+
+def render_job(job):
+    start = time.perf_counter()
+    fig = _get_function(job.function)(*job.args)
+    plt.close(fig)
+    return job.name, time.perf_counter() - start
+
+
+# Draw a figure headless and return it as an image file in memory ("svg", "png"...)
+def render_image(function, args, image_format):
+    use_headless_backend()
+    fig = _get_function(function)(*args)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=image_format, bbox_inches="tight")
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+# Draw every figure and display them, as the interactive menu does
+def show_jobs(jobs):
+    plots.apply_style()
+    for job in jobs:
+        _get_function(job.function)(*job.args)
+    plt.show()
+
+
+# When several jobs write the same file, keep the last one, as it is the one whose figure would be kept
+def unique_jobs(jobs):
+    return list({job.output: job for job in jobs}.values())
+
+
+# Render and close every figure without displaying it, across a process pool when workers > 1.
+# Returns (name, seconds) for each job, in the order of "jobs".
+def render_jobs(jobs, workers=1):
+    use_headless_backend()
+    jobs = unique_jobs(jobs)
+    if len(jobs) > 1 and (workers is None or workers > 1):
+        with ProcessPoolExecutor(max_workers=workers, initializer=use_headless_backend) as executor:
+            render_times = list(executor.map(render_job, jobs))
+        # The spans of the workers are lost with them: record the time of each figure instead
+        for name, seconds in render_times:
+            instrument.record(name, seconds, figures=1)
+        return render_times
+    return [render_job(job) for job in jobs]
+
+
+def print_render_times(render_times):
+    width = max([len(name) for name, _ in render_times] + [6])
+    print(f"{'Figure':<{width}}  Time (s)")
+    for name, seconds in render_times:
+        print(f"{name:<{width}}  {seconds:8.3f}")
+    print(f"{'Total':<{width}}  {sum(seconds for _, seconds in render_times):8.3f}")
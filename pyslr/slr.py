@@ -1,479 +1,632 @@
 import json
+import os
+
+# Pandas, NumPy, matplotlib and pybtex are imported by the functions that need them, so starting the menu
+# or a stage that does not plot only pays for what it uses
+from bib_diff import normalize_title, diff_entries, duplicate_keys, write_match_report
+import instrument
+from instrument import traced, count
+
+config = {}
+
+
+# Read the configuration file and set the paths and options of every stage.
+# A relative "root_dir" is relative to the folder of the configuration file.
+def load_config(config_path='config.json'):
+    global config, root_dir, slr_articles_path, slr_authors_path, references_path, bib_path, cache_path
+    global dimensions, table_dimensions, stacked_dimensions, geography_levels, radar_dimensions, radar_grid
+    global bib_names, dedup_config, parse_workers, headless, render_workers, incremental, category_columns
+    global radar_renderer
+    global storage, database_path, latex_longtable, trace_file, network_levels, network_top, cooccurrence_dimensions
+
+    with open(config_path, 'r') as file:
+        config = json.load(file)
+
+    root_dir = os.path.join(os.path.dirname(config_path), config["root_dir"])
+
+    slr_articles_path = os.path.join(root_dir, config["articles_file_name"])
+    slr_authors_path = os.path.join(root_dir, config["authors_file_name"])
+    references_path = os.path.join(root_dir, config["references_folder"])
+    bib_path = os.path.join(root_dir, config["references_file_name"])
+    cache_path = os.path.join(root_dir, config.get("cache_folder", ".pyslr_cache"))
+    storage = config.get("storage", "xlsx")
+    database_path = os.path.join(root_dir, config.get("database_file_name", "slr.sqlite"))
+
+    dimensions = config["dimensions"]
+    table_dimensions = config["table_dimensions"]
+    stacked_dimensions = config["stacked_dimensions"]
+    geography_levels = config["geography_levels"]
+    radar_dimensions = config["radar_dimensions"]
+    radar_grid = config.get("radar_grid", [4, 6])
+    # "collections" draws every radar of a page in one Axes, "axes" draws one polar Axes per study
+    radar_renderer = config.get("radar_renderer", "collections")
+    bib_names = config["database_names"]
+    dedup_config = config.get("dedup", {})
+    parse_workers = config.get("parse_workers", 1)
+    headless = config.get("headless", False)
+    render_workers = config.get("render_workers", 1)
+    incremental = config.get("incremental", True)
+    latex_longtable = config.get("latex_longtable", False)
+    network_levels = config.get("network_levels", ["Author", "Institution", "Country"])
+    network_top = config.get("network_top", 20)
+    cooccurrence_dimensions = config.get("cooccurrence_dimensions", list(table_dimensions.keys()))
+
+    # Instrumentation: span timings, peak memory per span and a cProfile capture, summarized after each action
+    instrument.configure(config.get("timings", False), config.get("profile", False), config.get("trace_memory", False))
+    trace_file = config.get("trace_file")
+    if trace_file:
+        trace_file = os.path.join(root_dir, trace_file)
+
+    # Dimension columns repeat a few values over many rows and are loaded as categories
+    category_columns = ["Venue", "Department", "Institution", "City", "Country", "Continent",
+                        *dimensions.keys(), *table_dimensions.keys(), *geography_levels.keys()]
+
+
+article_columns = ["Study", "Citation", "Year", "Venue", "Title", "Comments", "Publication", "Author", "Authors",
+                   "DOI", "Total"]
+author_columns = ["Study", "Citation", "Year", "Venue", "Title", "Publication", "Author", "Department",
+                  "Institution", "City", "Country", "Continent"]
+df_articles = None
+df_authors = None
 
-import pandas as pd
-from pybtex.database.input import bibtex
-from matplotlib.ticker import MaxNLocator
+num_studies = 0
 
-from radar_chart import *
+# Query restricting the plots and LaTeX tables to some studies (see select_studies), and the folder name of
+# their outputs
+selection_query = ""
+selection_name = ""
+
+# Inverted index of the dimension values of df_articles, and the rows of the selection, rebuilt when the table
+# is loaded again
+dimension_index = None
+_indexed_articles = None
+_selected_rows = None
 
-with open('config.json', 'r') as file:
-    config = json.load(file)
+# Co-occurrence matrix of the dimension values of the selected studies, rebuilt when the table is loaded again or
+# the selection changes
+dimension_cooccurrence = None
+_cooccurrence_source = (None, None)
 
-root_dir = config["root_dir"]
 
-slr_articles_path = os.path.join(root_dir, config["articles_file_name"])
-slr_authors_path = os.path.join(root_dir, config["authors_file_name"])
-references_path = os.path.join(root_dir, config["references_folder"])
-bib_path = os.path.join(root_dir, config["references_file_name"])
+def get_dimension_index():
+    from study_index import build_index
 
-dimensions = config["dimensions"]
-table_dimensions = config["table_dimensions"]
-stacked_dimensions = config["stacked_dimensions"]
-geography_levels = config["geography_levels"]
-radar_dimensions = config["radar_dimensions"]
-bib_names = config["database_names"]
+    global dimension_index, _indexed_articles, _selected_rows
+    if dimension_index is None or _indexed_articles is not df_articles:
+        dimension_index = build_index(df_articles, [*dimensions.keys(), *table_dimensions.keys()])
+        _indexed_articles = df_articles
+        _selected_rows = None
+    return dimension_index
 
-plt.rcParams['font.family'] = 'serif'
-plt.rcParams['font.sans-serif'] = ['Century']
-plt.rcParams['font.size'] = 8
 
-df_articles = pd.DataFrame()
-df_authors = pd.DataFrame()
+# Row positions of the selected studies, or None when every study is selected
+def get_selected_rows():
+    from study_index import query, positions
 
-num_studies = 0
+    global _selected_rows
+    if not selection_query:
+        return None
+    index = get_dimension_index()
+    if _selected_rows is None:
+        _selected_rows = positions(index, query(index, selection_query))
+    return _selected_rows
 
 
-# Graph functions
-def plot_line(dimension, dim_count_dict):
-    fig, ax = plt.subplots()
-    labels = [value.replace(" ", "\n") for value in list(dim_count_dict.keys())]
-    bars = ax.plot(labels, dim_count_dict.values())
-    ax.set_title(f"{dimension} frequency chart (n = {num_studies} studies)")
-    if len(dim_count_dict) > 6:
-        plt.xticks(rotation=35)
-    ax.set_xlabel(f"{dimension}")
-    ax.set_ylabel("Frequency")
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.set_axisbelow(True)
-    ax.yaxis.set_major_locator(MaxNLocator(integer=True))
-    plt.grid(axis='y')
-    plt.savefig(os.path.join(root_dir, f"figures\\{dimension}_freq.pdf"), format="pdf", bbox_inches="tight")
-
-
-def plot_freq(dimension, dim_count_dict):
-    fig, ax = plt.subplots()
-    labels = [value.replace(" ", "\n") for value in list(dim_count_dict.keys())]
-    bars = ax.bar(labels, dim_count_dict.values())
-    ax.bar_label(bars)
-    ax.set_title(f"{dimension} frequency chart (n = {num_studies} studies)")
-    if len(dim_count_dict) > 6:
-        plt.xticks(rotation=35)
-    if len(dim_count_dict) <= 3:
-        ax.set_aspect(0.3)
-    ax.set_xlabel(f"{dimension}")
-    ax.set_ylabel("Frequency")
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.set_axisbelow(True)
-    ax.yaxis.set_major_locator(MaxNLocator(integer=True))
-    plt.grid(axis='y')
-    plt.savefig(os.path.join(root_dir, f"figures\\{dimension}_freq.pdf"), format="pdf", bbox_inches="tight")
-
-
-def plot_freq_stacked(dimension, stacked_dimension, dim_count_dict):
-    fig, ax = plt.subplots()
-    x = list(dim_count_dict.keys())
-    y_labels = list(dim_count_dict[x[0]].keys())
-    y_list = [[] for _ in y_labels]
-    ax.set_title(f"{dimension} and {stacked_dimension} frequency chart (n = {num_studies} studies)")
-
-    for i, label in enumerate(y_labels):
-        for key, item in dim_count_dict.items():
-            y_list[i].append(item[label])
-
-    y_list = [np.array(x) for x in y_list]
-
-    bottom = np.zeros(len(x))
-    bars = None
-    for y in y_list:
-        bars = ax.bar(x, y, bottom=bottom)
-        labels = [f"{int(bar.get_height())}" if bar.get_height() > 0.2 else '' for bar in bars]
-        ax.bar_label(bars, labels=labels, label_type='center', color='white')
-        bottom += y
-    ax.bar_label(bars)
-
-    ax.legend(y_labels)
-    ax.set_xlabel(f"{dimension}")
-    ax.set_ylabel("Frequency")
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.set_axisbelow(True)
-    ax.yaxis.set_major_locator(MaxNLocator(integer=True))
-    plt.grid(axis='y')
-    plt.savefig(os.path.join(root_dir, f"figures\\{dimension}_{stacked_dimension}_freq.pdf"), format="pdf",
-                bbox_inches="tight")
-
-
-def plot_freq_h(dimension, dim_count_dict):
-    fig, ax = plt.subplots()
-    bars = ax.barh(list(dim_count_dict.keys()), dim_count_dict.values())
-    ax.bar_label(bars)
-    ax.set_title(f"{dimension} frequency chart (n = {num_studies} studies)")
-    ax.set_ylabel(f"{dimension}")
-    ax.set_xlabel("Frequency")
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.set_axisbelow(True)
-    ax.xaxis.set_major_locator(MaxNLocator(integer=True))
-    plt.grid(axis='x')
-    plt.savefig(os.path.join(root_dir, f"figures\\{dimension}_freq.pdf"), format="pdf", bbox_inches="tight")
-
-
-def plot_pie(dimension, data_dict):
-    fig, ax = plt.subplots()
-    ax.pie(data_dict.values(), labels=[f"{label} ({data_dict[label]})" for label in data_dict.keys()],
-           autopct='%1.0f%%')
-    ax.set_title(f"{dimension} frequency chart (n = {num_studies} studies)")
-    centre_circle = plt.Circle((0, 0), 0.70, fc='white')
-    fig = plt.gcf()
-
-    # Adding Circle in Pie chart
-    fig.gca().add_artist(centre_circle)
-    plt.savefig(os.path.join(root_dir, f"figures\\{dimension}_freq.pdf"), format="pdf", bbox_inches="tight")
-
-
-def plot_graph(dimension, data_dict, graph_type):
-    if graph_type == "B":
-        plot_freq(dimension, data_dict)
-    elif graph_type == "BH":
-        plot_freq_h(dimension, data_dict)
-    elif graph_type == "P":
-        plot_pie(dimension, data_dict)
-    elif graph_type == "L":
-        plot_line(dimension, data_dict)
-
-
-def create_dimension_plots():
-    for dimension in dimensions.keys():
-        try:
-            dim_col = df_articles[dimension]
-        except:
-            print(f"Dimension '{dimension}' is missing. Skipping.")
-            continue
-        dim_count_dict = {}
-        for dims in dim_col:
-            dims_split = str(dims).split(",")
-            for d in dims_split:
-                dim = d.strip()
-                if '\"' in dim:
-                    dim = dim.replace("\"", "")
-                if dim in dim_count_dict:
-                    dim_count_dict[dim] += 1
-                else:
-                    dim_count_dict[dim] = 1
-
-        if dimension == "Year":
-            dim_count_dict = dict(sorted(dim_count_dict.items()))
-        else:
-            dim_count_dict = dict(sorted(dim_count_dict.items(), key=lambda x: x[1], reverse=True))
+# Restrict the plots and LaTeX tables to the studies matching a query, such as
+# "Data source = Social media AND NOT Purpose = Planning AND Year >= 2020" (see study_index.query).
+# Their outputs are written to selections/<name>. An empty query selects every study again.
+@traced()
+def select_studies(query_text, name="selection"):
+    global selection_query, selection_name, _selected_rows
+
+    selection_query = query_text.strip()
+    selection_name = name if selection_query else ""
+    _selected_rows = None
+    rows = get_selected_rows()
+    if rows is not None:
+        print(f"{len(rows)} of {num_studies} studies selected")
+        os.makedirs(os.path.join(output_dir(), "figures"), exist_ok=True)
+    return rows
+
+
+def get_num_studies():
+    rows = get_selected_rows()
+    return num_studies if rows is None else len(rows)
 
-        for graph_type in dimensions[dimension]:
-            if graph_type == "BH":
-                dim_count_dict = dict(sorted(dim_count_dict.items(), key=lambda x: x[1]))
-            plot_graph(dimension, dim_count_dict, graph_type)
 
-    plt.show()
+# The given columns of the selected studies. Without a selection, the table itself, as nothing is filtered;
+# with one, only the given columns are copied.
+def selected_articles(columns):
+    rows = get_selected_rows()
+    if rows is None:
+        return df_articles
+    columns = [column for column in dict.fromkeys(columns) if column in df_articles.columns]
+    return df_articles[columns].take(rows)
 
 
-def create_stacked_dimension_plots():
-    for dim1, dim2 in stacked_dimensions:
-        stacked_dim_dict = {}
-        stacked_dim_values = set()
-        for index, row in df_articles.iterrows():
-            stacked_dim_values.add((str(row[dim2]), 0))
+def selected_authors():
+    rows = get_selected_rows()
+    if rows is None:
+        return df_authors
+    return df_authors[df_authors["Study"].isin(df_articles["Study"].take(rows))]
 
-        for index, row in df_articles.iterrows():
-            x = str(row[dim1])
-            if x not in stacked_dim_dict:
-                stacked_dim_dict[x] = dict(stacked_dim_values)
 
-            y = row[dim2]
+def get_dimension_cooccurrence():
+    from cooccurrence import build_cooccurrence
 
-            stacked_dim_dict[x][y] += 1
+    global dimension_cooccurrence, _cooccurrence_source
+    source_articles, source_query = _cooccurrence_source
+    if dimension_cooccurrence is None or source_articles is not df_articles or source_query != selection_query:
+        columns = list(dict.fromkeys([*dimensions.keys(), *cooccurrence_dimensions,
+                                      *(dim for pair in stacked_dimensions for dim in pair)]))
+        dimension_cooccurrence = build_cooccurrence(selected_articles(columns), columns)
+        _cooccurrence_source = (df_articles, selection_query)
+    return dimension_cooccurrence
 
-        if dim1 == "Year":
-            stacked_dim_dict = dict(sorted(stacked_dim_dict.items()))
 
+# Folder of the figures and LaTeX tables: the review folder, or the folder of the selection
+def output_dir():
+    if selection_name:
+        return os.path.join(root_dir, "selections", selection_name)
+    return root_dir
+
+
+# The LaTeX tables are written to the working directory, and the ones of a selection to its folder
+def latex_path(file_name):
+    if selection_name:
+        return os.path.join(output_dir(), file_name)
+    return file_name
+
+
+@traced()
+def get_dimension_counts():
+    from dimension_counts import compute_dimension_counts
+
+    count("rows", get_num_studies())
+    return compute_dimension_counts(selected_articles(list(dimensions.keys())), dimensions.keys())
+
+
+# Counts of the stacked plots of the given pairs of dimensions (default: "stacked_dimensions"), read from the
+# co-occurrence matrix: {(dim1, dim2): {dim1 value: {dim2 value: studies}}}
+def get_stacked_counts(pairs=None):
+    from cooccurrence import pair_counts
+
+    cooccurrence = get_dimension_cooccurrence()
+    stacked = {}
+    for dim1, dim2 in stacked_dimensions if pairs is None else pairs:
+        if dim1 not in cooccurrence["slices"] or dim2 not in cooccurrence["slices"]:
+            print(f"Dimension '{dim1}' or '{dim2}' is missing. Skipping.")
+            continue
+        stacked[(dim1, dim2)] = pair_counts(cooccurrence, dim1, dim2)
+    return stacked
+
+
+# Display the figures or, in headless mode, render the ones whose inputs changed since the last build
+@traced()
+def draw_figures(jobs):
+    from render import show_jobs, use_headless_backend, unique_jobs, render_jobs, print_render_times
+    from manifest import manifest_file_name, load_manifest, save_manifest, find_stale_jobs
+
+    if not headless:
+        show_jobs(jobs)
+        return
+
+    use_headless_backend()
+    jobs = unique_jobs(jobs)
+    manifest_path = os.path.join(root_dir, "figures", manifest_file_name)
+    manifest = load_manifest(manifest_path) if incremental else {}
+    stale_jobs, digests = find_stale_jobs(jobs, manifest)
+    print(f"{len(jobs) - len(stale_jobs)} figures up to date, {len(stale_jobs)} to render")
+    if stale_jobs:
+        print_render_times(render_jobs(stale_jobs, render_workers))
+    manifest.update({job.output: digests[job.output] for job in stale_jobs})
+    save_manifest(manifest, manifest_path)
+
+
+def graph_jobs(count_dicts, graph_types):
+    from render import RenderJob
+    from plots import figure_path
+
+    jobs = []
+    for dimension, dim_count_dict in count_dicts.items():
+        for graph_type in graph_types[dimension]:
+            # Only the BH graph sorts the values by count; the other graph types keep the original order
+            counts = dict(sorted(dim_count_dict.items(), key=lambda x: x[1])) if graph_type == "BH" else dim_count_dict
+            jobs.append(RenderJob(f"{dimension} ({graph_type})", "plot_graph",
+                                  (dimension, counts, graph_type, get_num_studies(), output_dir()),
+                                  figure_path(output_dir(), f"{dimension}_freq")))
+    return jobs
+
+
+@traced()
+def create_dimension_plots(counts=None):
+    if counts is None:
+        counts = get_dimension_counts()
+    draw_figures(graph_jobs(counts["dimensions"], dimensions))
+
+
+# Stacked plots of the given pairs of dimensions (default: "stacked_dimensions"), read from the co-occurrence
+# matrix unless the counts (from get_stacked_counts) are given
+@traced()
+def create_stacked_dimension_plots(stacked=None, pairs=None):
+    from render import RenderJob
+    from plots import figure_path
+
+    if stacked is None:
+        stacked = get_stacked_counts(pairs)
+    jobs = []
+    for (dim1, dim2), stacked_dim_dict in stacked.items():
         print(stacked_dim_dict)
-        plot_freq_stacked(dim1, dim2, stacked_dim_dict)
+        jobs.append(RenderJob(f"{dim1} and {dim2}", "plot_freq_stacked",
+                              (dim1, dim2, stacked_dim_dict, get_num_studies(), output_dir()),
+                              figure_path(output_dir(), f"{dim1}_{dim2}_freq")))
+    draw_figures(jobs)
 
-    plt.show()
 
+# Heatmap and table (dimension_cooccurrence.tsv) of the number of studies having each pair of values of the
+# "cooccurrence_dimensions"
+@traced()
+def create_cooccurrence_heatmap():
+    from cooccurrence import cooccurrence_frame
+    from render import RenderJob
+    from plots import figure_path
 
+    frame = cooccurrence_frame(get_dimension_cooccurrence(), cooccurrence_dimensions)
+    frame.to_csv(os.path.join(output_dir(), "dimension_cooccurrence.tsv"), sep="\t")
+    print(f"{len(frame.index)} dimension values")
+    draw_figures([RenderJob("Dimension co-occurrence", "plot_heatmap",
+                            ("Dimension co-occurrence", frame, get_num_studies(), output_dir()),
+                            figure_path(output_dir(), "Dimension co-occurrence_heatmap"))])
+
+
+@traced()
 def create_radar_plots():
-    half = int(len(df_articles.index) / 2)
-    df1 = df_articles.iloc[0:half]
-    df2 = df_articles.iloc[half::]
-
-    plot_radar_many(df1, radar_dimensions, root_dir, "dimensions_radar_1")
-    plot_radar_many(df2, radar_dimensions, root_dir, "dimensions_radar_2")
-
-
-def create_geography_plots():
-    for geography in geography_levels.keys():
-        combination_list = []
-        geography_count = {}
-        for index, row in df_authors.iterrows():
-            study = row["Study"]
-            value = row[geography]
-            key = f"{study}_{value}"
-            if value not in geography_count:
-                geography_count[value] = 0
-            if key not in combination_list:
-                combination_list.append(key)
-                geography_count[value] += 1
-        geography_count = dict(sorted(geography_count.items(), key=lambda x: x[1]))
-        for graph_type in geography_levels[geography]:
-            plot_graph(geography, geography_count, graph_type)
-    plt.show()
-
-
-def get_venue(bibtex_type):
-    if bibtex_type == "inproceedings":
-        return "Conference"
-    if bibtex_type == "article":
-        return "Journal"
-    if bibtex_type == "incollection" or bibtex_type == "inbook":
-        return "Book Chapter"
-    if bibtex_type == "book":
-        return "Book"
-
-
-def get_publication(entry):
-    publication = False
-    if entry.type == "inproceedings" or entry.type == "conference":
-        publication = entry.fields.get("booktitle", False)
-    elif entry.type == "article":
-        publication = entry.fields.get("journal", False)
-    elif entry.type == "incollection" or entry.type == "inbook":
-        publication = entry.fields.get("booktitle", False)
-    elif entry.type == "book":
-        publication = entry.fields.get("booktitle", False)
-
-    if not publication:
-        publication = entry.fields.get("journal")
-
-    return publication
-
-
-def get_main_author(entry):
-    authors = entry.persons["author"]
-    return " ".join(authors[0].last_names)
-
-
-def get_authors_list(entry):
-    authors = entry.persons["author"]
-    return "#".join([a.__str__() for a in authors])
-
-
-def get_word_acronym(word):
-    if word == "N/A" or word == '"N/A"':
-        return "-"
-    elif len(word) <= 2 or word.isupper():
-        return word.upper()
-    else:
-        return word.upper()[0]
-
-
-def get_dimension_value_acronym(dimension_value, existing_acronyms):
-    if dimension_value in existing_acronyms.keys():
-        return existing_acronyms[dimension_value]
-    
-    words = dimension_value.replace("-", " ").split()
-    acronym = ""
-    if len(words) > 1:
-        for word in words:
-            acronym += get_word_acronym(word)
-    else:
-        acronym = get_word_acronym(words[0])
+    from render import RenderJob
+    from plots import figure_path
+
+    nrows, ncols = radar_grid
+    df = selected_articles(["Study", *(f"{dimension} score" for dimension in radar_dimensions)])
+    function = "plot_radar_pages" if radar_renderer == "axes" else "plot_radar_grid"
+    draw_figures([RenderJob("dimensions_radar", function,
+                            (df, radar_dimensions, output_dir(), "dimensions_radar", nrows, ncols),
+                            figure_path(output_dir(), "dimensions_radar"))])
+
+
+# The radars of the selected studies on a single radar, to compare them
+@traced()
+def create_radar_overlay():
+    from render import RenderJob
+    from plots import figure_path
+
+    df = selected_articles(["Study", *(f"{dimension} score" for dimension in radar_dimensions)])
+    draw_figures([RenderJob("dimensions_radar_overlay", "plot_radar_overlay",
+                            (df, radar_dimensions, output_dir(), "dimensions_radar_overlay"),
+                            figure_path(output_dir(), "dimensions_radar_overlay"))])
+
+
+@traced()
+def get_geography_counts():
+    from geography import compute_geography_counts
+
+    df = selected_authors()
+    count("rows", len(df.index))
+    return compute_geography_counts(df, geography_levels.keys())
+
+
+@traced()
+def create_geography_plots(counts=None):
+    if counts is None:
+        counts = get_geography_counts()
+    draw_figures(graph_jobs(counts, geography_levels))
+
+
+# Collaboration networks of the authors and of the "network_levels" of the authors table: tables of the pairs that
+# share the most studies, of the collaborators of each item and of the connected components, with a bar chart of
+# the top pairs and a heatmap per level
+@traced()
+def create_network_analysis():
+    from networks import compute_networks, write_network_tables
+    from render import RenderJob
+    from plots import figure_path
+
+    networks = compute_networks(selected_articles(["Study", "Authors"]), selected_authors(), network_levels,
+                                network_top)
+    write_network_tables(networks, os.path.join(output_dir(), "networks"))
+    jobs = []
+    for level, network in networks.items():
+        print(f"{level}: {len(network['items'].index)} items, {len(network['components'].index)} connected components")
+        pairs = network["pairs"]
+        if pairs.empty:
+            continue
+        name = f"{level} collaboration"
+        pair_counts = dict(sorted(zip(pairs["Item 1"] + " - " + pairs["Item 2"], pairs["Studies"]),
+                                  key=lambda x: x[1]))
+        jobs.append(RenderJob(name, "plot_freq_h", (name, pair_counts, get_num_studies(), output_dir()),
+                              figure_path(output_dir(), f"{name}_freq")))
+        jobs.append(RenderJob(f"{name} heatmap", "plot_heatmap",
+                              (name, network["matrix"], get_num_studies(), output_dir()),
+                              figure_path(output_dir(), f"{name}_heatmap")))
+    count("rows", get_num_studies())
+    draw_figures(jobs)
+
+
+def get_study_id(study_number):
+    if study_number < 10:
+        return f"S0{study_number}"
+    return f"S{study_number}"
+
+
+# Build the article and author rows of the given Bibtex records, collected column by column
+def build_table_rows(records, first_study_number=1):
+    import pandas as pd
+
+    articles = {column: [] for column in article_columns}
+    authors = {column: [] for column in author_columns}
+    for study_number, record in enumerate(records, start=first_study_number):
+        study = get_study_id(study_number)
+        year = int(record.year)
+
+        article_row = (study, record.key, year, record.venue, record.title,
+                       "Put your comments about this article here...", record.publication,
+                       f"{record.main_author} et al.", "#".join(record.authors), record.doi, 0)
+        for column, value in zip(article_columns, article_row):
+            articles[column].append(value)
+
+        for author in record.authors:
+            author_row = (study, record.key, year, record.venue, record.title, record.publication, author,
+                          "Blank", "Blank", "Blank", "Blank", "Blank")
+            for column, value in zip(author_columns, author_row):
+                authors[column].append(value)
+
+    # The Year and Total columns stay integers even when there are no records
+    return (pd.DataFrame(articles, columns=article_columns).astype({"Year": "int64", "Total": "int64"}),
+            pd.DataFrame(authors, columns=author_columns).astype({"Year": "int64"}))
+
+
+# Give new rows the integer and string dtypes of the table they are appended to, so that appending them does not
+# turn its integer and string columns into floats and objects. Other columns are left as they are: a column the
+# reviewers left empty is read back as all-NaN floats, and categorical columns may get new categories.
+def match_dtypes(df_new, df_existing):
+    import pandas as pd
+
+    dtypes = {column: dtype for column, dtype in df_existing.dtypes.items() if column in df_new.columns and
+              (pd.api.types.is_integer_dtype(dtype) or isinstance(dtype, pd.StringDtype))}
+    return df_new.astype(dtypes)
 
-    if acronym in existing_acronyms.values():
-        acronym += dimension_value[1].lower()
-    return acronym
+
+def read_references(file_paths):
+    from bib_cache import read_bib_files, print_cache_stats
+
+    record_streams, stats = read_bib_files(file_paths, cache_path, parse_workers)
+    print_cache_stats(stats)
+    return record_streams
 
 
 # Given a Bibtex file (at "bib_path"), update the "articles" and "authors" files
+@traced()
 def update_slr_tables_from_bibtex():
-    parser = bibtex.Parser()
-    bibtex_data = parser.parse_file(bib_path)
+    import pandas as pd
+    from table_store import store_table
+    from xlsx_writer import write_excel
+
+    if storage == "sqlite":
+        update_slr_database_from_bibtex()
+        return
+
+    # The tables are loaded lazily: read them now, unless the review has no tables yet
+    if df_articles is None or df_authors is None:
+        try:
+            load_tables()
+        except FileNotFoundError:
+            pass
+
+    record_stream = read_references([bib_path])[0]
+    existing_articles = df_articles if df_articles is not None else pd.DataFrame()
+    existing_authors = df_authors if df_authors is not None else pd.DataFrame()
+    existing_titles = {normalize_title(title) for title in existing_articles.get('Title', [])}
     new_entries = []
-    for entry in bibtex_data.entries.values():
-        title = entry.fields['title']
-        if len(df_articles.loc[df_articles['Title'] == title].index) == 0:
-            new_entries.append(entry)
+    for record in record_stream:
+        title = normalize_title(record.title)
+        if title not in existing_titles:
+            existing_titles.add(title)
+            new_entries.append(record)
 
     print(f"Number of new entries: {len(new_entries)}")
-    df_articles_new = df_articles.copy()
-    df_authors_new = df_authors.copy()
-    for new_entry in new_entries:
-        study_number = len(df_articles_new.index) + 1
-        if study_number < 10:
-            study_number = f"S0{study_number}"
-        else:
-            study_number = f"S{study_number}"
-
-        new_article_row = {"Study": study_number,
-                           "Citation": new_entry.key,
-                           "Year": int(new_entry.fields['year']),
-                           "Venue": get_venue(new_entry.type),
-                           "Title": new_entry.fields['title'],
-                           "Comments": "Put your comments about this article here...",
-                           "Publication": get_publication(new_entry),
-                           "Author": get_main_author(new_entry) + " et al.",
-                           "Authors": get_authors_list(new_entry),
-                           "DOI": new_entry.fields['doi'],
-                           "Total": 0,
-                           }
-        df_articles_new = df_articles_new.append(new_article_row, ignore_index=True)
-        # print(new_article_row)
-        for author in list(new_entry.persons["author"]):
-            new_author_row = {"Study": study_number,
-                              "Citation": new_entry.key,
-                              "Year": int(new_entry.fields['year']),
-                              "Venue": get_venue(new_entry.type),
-                              "Title": new_entry.fields['title'],
-                              "Publication": get_publication(new_entry),
-                              "Author": author.__str__(),
-                              "Department": "Blank", "Institution": "Blank", "City": "Blank", "Country": "Blank",
-                              "Continent": "Blank",
-                              }
-            df_authors_new = df_authors_new.append(new_author_row, ignore_index=True)
-    df_articles_new.to_excel(config["articles_file_name"], index=False)
-    df_authors_new.to_excel(config["authors_file_name"], index=False)
+    count("rows", len(new_entries))
+    if not new_entries:
+        return
+    df_new_articles, df_new_authors = build_table_rows(new_entries, len(existing_articles.index) + 1)
+    df_articles_new = pd.concat([existing_articles, match_dtypes(df_new_articles, existing_articles)],
+                                ignore_index=True)
+    df_authors_new = pd.concat([existing_authors, match_dtypes(df_new_authors, existing_authors)],
+                               ignore_index=True)
+    write_excel(df_articles_new, slr_articles_path)
+    write_excel(df_authors_new, slr_authors_path)
+    store_table(df_articles_new, slr_articles_path, cache_path, category_columns)
+    store_table(df_authors_new, slr_authors_path, cache_path, category_columns)
+
+
+# Given a Bibtex file (at "bib_path"), add its new entries to the review database
+@traced()
+def update_slr_database_from_bibtex():
+    from sqlite_store import connect, existing_titles, insert_bibtex
+
+    conn = connect(database_path)
+    known_titles = existing_titles(conn)
+    new_entries = []
+    for record in read_references([bib_path])[0]:
+        title = normalize_title(record.title)
+        if title not in known_titles:
+            known_titles.add(title)
+            new_entries.append(record)
+
+    # Another update may have inserted some of the entries meanwhile: they are checked again while inserting
+    if new_entries:
+        new_entries = insert_bibtex(conn, new_entries, build_table_rows)
+    conn.close()
+    print(f"Number of new entries: {len(new_entries)}")
+    count("rows", len(new_entries))
 
 
 # Given two Bibtex files from the same database, return a .bib file with the new articles (removing duplicates)
+@traced()
 def get_new_entries():
+    from bib_reader import write_bib_records
+    from bib_cache import iter_cached_records
+
+    file_paths = []
     for bib in bib_names:
-        parser = bibtex.Parser()
-        bib_prev_data = parser.parse_file(os.path.join(references_path, f"{bib}_old.bib"))
-        parser = bibtex.Parser()
-        bib_new_data = parser.parse_file(os.path.join(references_path, f"{bib}.bib"))
+        file_paths.append(os.path.join(references_path, f"{bib}_old.bib"))
+        file_paths.append(os.path.join(references_path, f"{bib}.bib"))
+    record_streams = read_references(file_paths)
+
+    for i, bib in enumerate(bib_names):
+        bib_prev_records = record_streams[2 * i]
+        bib_new_records = record_streams[2 * i + 1]
+
+        matches = diff_entries(((r.key, r.title, r.doi) for r in bib_prev_records),
+                               ((r.key, r.title, r.doi) for r in bib_new_records))
+        duplicates = duplicate_keys(matches)
+        new_records = [r for r in iter_cached_records(cache_path, file_paths[2 * i + 1]) if r.key not in duplicates]
+
+        print(f"{bib}: {len(duplicates)} duplicates (exact: {len(matches['exact'])}, DOI only: "
+              f"{len(matches['doi'])}, title only: {len(matches['title'])}, title and DOI of different entries: "
+              f"{len(matches['conflict'])})")
+        print(f"{bib}: {len(new_records)} new entries")
+        count("rows", len(new_records))
 
-        duplicates = []
-        for old_entry in bib_prev_data.entries.values():
-            old_title = old_entry.fields['title']
-            for new_entry in bib_new_data.entries.values():
-                new_title = new_entry.fields['title']
-                if old_title == new_title:
-                    duplicates.append(new_entry)
+        write_match_report(matches, os.path.join(references_path, f"{bib}_duplicates.tsv"))
+        write_bib_records(new_records, os.path.join(references_path, f"{bib}_new_entries.bib"))
 
-        for d in duplicates:
-            bib_new_data.entries.pop(d.key)
 
-        print(len(duplicates))
-        print(len(bib_new_data.entries))
+# Given the Bibtex files of every database, return a report with clusters of likely duplicate entries
+@traced()
+def find_near_duplicates():
+    from dedup import find_duplicate_clusters, write_cluster_report
 
-        bib_new_data.to_file(os.path.join(references_path, f"{bib}_new_entries.bib"))
+    record_streams = read_references([os.path.join(references_path, f"{bib}.bib") for bib in bib_names])
+    entries = [(bib, record.key, record.title) for bib, records in zip(bib_names, record_streams) for record in records]
+    count("rows", len(entries))
 
+    clusters = find_duplicate_clusters([title for _, _, title in entries],
+                                       shingle_size=dedup_config.get("shingle_size", 3),
+                                       num_perm=dedup_config.get("num_perm", 64),
+                                       bands=dedup_config.get("bands", 16),
+                                       threshold=dedup_config.get("threshold", 0.8))
+    print(f"Number of likely duplicate clusters: {len(clusters)}")
+    write_cluster_report(clusters, entries, os.path.join(references_path, "near_duplicates.tsv"))
 
+
+@traced()
 def create_table_files_from_bibtex():
-    df_articles_new = pd.DataFrame()
-    df_authors_new = pd.DataFrame()
-    parser = bibtex.Parser()
-    bibtex_data = parser.parse_file(bib_path)
-    articles_list = []
-    authors_list = []
-    for new_entry in bibtex_data.entries.values():
-        study_number = len(df_articles_new.index) + 1
-        if study_number < 10:
-            study_number = f"S0{study_number}"
-        else:
-            study_number = f"S{study_number}"
-
-        new_article_row = {"Study": study_number,
-                           "Citation": new_entry.key,
-                           "Year": int(new_entry.fields['year']),
-                           "Venue": get_venue(new_entry.type),
-                           "Title": new_entry.fields['title'],
-                           "Comments": "Put your comments about this article here...",
-                           "Publication": get_publication(new_entry),
-                           "Author": get_main_author(new_entry) + " et al.",
-                           "Authors": get_authors_list(new_entry),
-                           "DOI": new_entry.fields['doi'],
-                           "Total": 0,
-                           }
-        articles_list.append(new_article_row)
-        # df_articles_new = df_articles_new.append(new_article_row, ignore_index=True)
-        for author in list(new_entry.persons["author"]):
-            new_author_row = {"Study": study_number,
-                              "Citation": new_entry.key,
-                              "Year": int(new_entry.fields['year']),
-                              "Venue": get_venue(new_entry.type),
-                              "Title": new_entry.fields['title'],
-                              "Publication": get_publication(new_entry),
-                              "Author": author.__str__(),
-                              "Department": "Blank", "Institution": "Blank", "City": "Blank", "Country": "Blank",
-                              "Continent": "Blank",
-                              }
-            authors_list.append(new_author_row)
-            # df_authors_new = df_authors_new.append(new_author_row, ignore_index=True)
-    df_articles_new = pd.DataFrame(articles_list)
-    df_authors_new = pd.DataFrame(authors_list)
-    df_articles_new.to_excel(slr_articles_path, index=False)
-    df_authors_new.to_excel(slr_authors_path, index=False)
-    return df_articles_new, df_authors_new
+    from table_store import store_table
+    from xlsx_writer import write_excel
+
+    df_articles_new, df_authors_new = build_table_rows(read_references([bib_path])[0])
+    count("rows", len(df_articles_new.index))
+    write_excel(df_articles_new, slr_articles_path)
+    write_excel(df_authors_new, slr_authors_path)
+    if storage == "sqlite":
+        from sqlite_store import connect, import_tables, record_sync
+
+        conn = connect(database_path)
+        import_tables(conn, df_articles_new, df_authors_new)
+        record_sync(conn, [slr_articles_path, slr_authors_path])
+        conn.close()
+    return (store_table(df_articles_new, slr_articles_path, cache_path, category_columns),
+            store_table(df_authors_new, slr_authors_path, cache_path, category_columns))
 
 
+@traced()
 def create_latex_information_table():
-    with open('info.tex', 'w') as f:
-        f.write("\\begin{tabular}{lllll}\n")
-        f.write("\\toprule\n")
-        f.write("Study & Year & Citation & Title & Publication \\\\[0.1cm]\n")
-        f.write("\\midrule\n")
-
-        for index, row in df_articles.iterrows():
-            clean_title = str(row['Title']).replace('&', '\\&').replace('%', '\\%')
-            clean_pub = str(row['Publication']).replace('&', '\\&').replace('%', '\\%')
-            f.write(f"{row['Study']} & {row['Year']} & \\cite" + "{" + row['Citation'] + "}" + f" & {clean_title} "
-                                                                                               f"& {clean_pub} \\\\[0.2cm]\n")
-        f.write("\\bottomrule\n")
-        f.write("\\end{tabular}\n")
-        f.close()
+    from latex_export import write_information_table
 
+    df = selected_articles(["Study", "Year", "Citation", "Title", "Publication"])
+    write_information_table(df, latex_path('info.tex'), latex_longtable)
+    count("rows", len(df.index))
 
+
+@traced()
 def create_latex_summary_table():
-    dim_acronyms = {k: {} for (k, _) in table_dimensions.items()}
-    with open('summary.tex', 'w') as f:
-        f.write("\\begin{tabular}{" + "l" * (len(table_dimensions) + 1) + "}\n")
-        f.write("\\toprule\n")
-
-        column_line = "Study & " + " & ".join(table_dimensions.keys()) + "\\\\[0.1cm]\n"
-        f.write(column_line)
-        f.write("\\midrule\n")
-
-        for index, row in df_articles.iterrows():
-            line_list = ["\\cite{" + row['Citation'] + "}"]
-            for dimension in table_dimensions.keys():
-                dim_values = row[dimension].split(',')
-                acronym_values = []
-                for v in dim_values:
-                    value = v.strip()
-                    acronym = get_dimension_value_acronym(value, dim_acronyms[dimension])
-                    if value not in dim_acronyms[dimension].keys():
-                        print(value)
-                        dim_acronyms[dimension][value] = acronym
-                    acronym_values.append(acronym)
-                acronym_values.sort()
-                line_list.append(", ".join(acronym_values))
-            line = " & ".join(line_list) + " \\\\[0.2cm]\n"
-            f.write(line)
-        f.write("\\bottomrule\n")
-        f.write("\\end{tabular}\n")
-        f.close()
+    from latex_export import write_summary_table
+
+    df = selected_articles(["Citation", *table_dimensions.keys()])
+    dim_acronyms = write_summary_table(df, table_dimensions.keys(), latex_path('summary.tex'), latex_longtable)
     print(dim_acronyms)
+    count("rows", len(df.index))
+
+
+@traced()
+def load_tables():
+    from table_store import load_table
 
+    global df_articles
+    global df_authors
+    global num_studies
 
+    if storage == "sqlite":
+        df_articles, df_authors = load_database_tables()
+    else:
+        df_articles = load_table(slr_articles_path, cache_path, category_columns)
+        df_authors = load_table(slr_authors_path, cache_path, category_columns)
+    num_studies = len(df_articles.index)
+    count("rows", num_studies + len(df_authors.index))
+
+
+# Read the review tables from the database. An empty database is first filled from the xlsx tables.
+def load_database_tables():
+    from sqlite_store import connect, count_articles, edited_since_sync, import_tables, read_tables, record_sync
+    from table_store import load_table, to_categories
+
+    conn = connect(database_path)
+    try:
+        if count_articles(conn) == 0:
+            print(f"Importing the review tables into {database_path}")
+            import_tables(conn, load_table(slr_articles_path, cache_path), load_table(slr_authors_path, cache_path))
+            record_sync(conn, [slr_articles_path, slr_authors_path])
+        for file_path in edited_since_sync(conn, [slr_articles_path, slr_authors_path], database_path):
+            print(f"Warning: {file_path} was edited after it was last imported into or exported from "
+                  f"{database_path}. Its changes are not in the database and the export will not overwrite it. "
+                  f"Delete the database to import the xlsx tables again.")
+        df_articles_db, df_authors_db = read_tables(conn)
+    finally:
+        conn.close()
+    return to_categories(df_articles_db, category_columns), to_categories(df_authors_db, category_columns)
+
+
+# Write the review tables and the LaTeX tables handed to co-authors
+@traced()
+def export_tables():
+    from xlsx_writer import write_excel
+
+    if storage == "sqlite":
+        from sqlite_store import connect, edited_since_sync, record_sync
+
+        conn = connect(database_path)
+        try:
+            edited = edited_since_sync(conn, [slr_articles_path, slr_authors_path], database_path)
+            if edited:
+                # Overwriting them would lose the edits made in the xlsx tables
+                print(f"Not exporting the tables: {', '.join(edited)} were edited after the last import or export.")
+            else:
+                write_excel(df_articles, slr_articles_path)
+                write_excel(df_authors, slr_authors_path)
+                record_sync(conn, [slr_articles_path, slr_authors_path])
+                print(f"Tables exported to {slr_articles_path} and {slr_authors_path}")
+        finally:
+            conn.close()
+    create_latex_information_table()
+    create_latex_summary_table()
+
+
+@traced()
 def init():
     global df_articles
     global df_authors
     global num_studies
 
     try:
-        df_articles = pd.read_excel(slr_articles_path)
-        num_studies = len(df_articles.index)
-        df_authors = pd.read_excel(slr_authors_path)
+        load_tables()
     except:
         choice = input("The tables could not be read. Do you wish to load from a Bibtex file? Y/N")
         if choice == "Y":
@@ -482,6 +635,16 @@ def init():
         print("Tables created. You can now fill the tables with manual information")
 
 
+# Print the spans of the last action and write them to the trace file, when the instrumentation is on
+def report_instrumentation():
+    if not instrument.enabled:
+        return
+    instrument.print_summary()
+    if trace_file:
+        instrument.write_trace(trace_file)
+    instrument.reset()
+
+
 def display_menu():
     print("--- Plots")
     print("1. Create dimension plots")
@@ -493,15 +656,25 @@ def display_menu():
     print("6. Get reference difference")
     print("7. Create LaTeX information table")
     print("8. Create LaTeX summary table")
+    print("--- Queries")
+    print("10. Select studies (e.g. Data source = Social media AND Year >= 2020)")
+    print("--- Networks")
+    print("11. Create collaboration networks")
+    print("12. Create dimension co-occurrence heatmap")
+    print("13. Create stacked plot of two dimensions")
+    print("14. Create radar overlay of the selected studies")
+    print("--- References")
+    print("15. Find near-duplicate references")
     print("(9. Exit)\n")
 
 
 def main():
     print("PySLR\n")
+    load_config()
     while True:
         init()
         display_menu()
-        choice = input("Enter your choice (1-9): ")
+        choice = input("Enter your choice (1-8, 10-15, or 9 to exit): ")
 
         if choice == '1':
             create_dimension_plots()
@@ -519,11 +692,31 @@ def main():
             create_latex_information_table()
         elif choice == "8":
             create_latex_summary_table()
+        elif choice == '10':
+            query_text = input("Query (empty to select every study): ")
+            name = input("Name of the selection: ") if query_text.strip() else ""
+            try:
+                select_studies(query_text, name or "selection")
+            except ValueError as e:
+                print(e)
+        elif choice == '11':
+            create_network_analysis()
+        elif choice == '12':
+            create_cooccurrence_heatmap()
+        elif choice == '13':
+            dim1 = input("First dimension: ")
+            dim2 = input("Second dimension: ")
+            create_stacked_dimension_plots(pairs=[(dim1, dim2)])
+        elif choice == '14':
+            create_radar_overlay()
+        elif choice == '15':
+            find_near_duplicates()
         elif choice == '9':
             print("Exiting. See you soon!")
             break
         else:
             print("Invalid choice. Please try again.")
+        report_instrumentation()
         print("\n")
 
 
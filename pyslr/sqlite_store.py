@@ -0,0 +1,162 @@
+import os
+import sqlite3
+
+import pandas as pd
+
+from bib_diff import normalize_title, normalize_doi
+
+# Fixed columns of each table; the classification columns added by the reviewers (dimensions, scores,
+# geography...) are added to the tables as they appear
+schema = """
+CREATE TABLE IF NOT EXISTS articles (
+    "Study" TEXT PRIMARY KEY,
+    "Citation" TEXT,
+    "Year",
+    "Venue" TEXT,
+    "Title" TEXT,
+    "Comments" TEXT,
+    "Publication" TEXT,
+    "Author" TEXT,
+    "Authors" TEXT,
+    "DOI" TEXT,
+    "Total",
+    "NormTitle" TEXT,
+    "NormDOI" TEXT
+);
+CREATE INDEX IF NOT EXISTS articles_citation ON articles ("Citation");
+CREATE INDEX IF NOT EXISTS articles_doi ON articles ("NormDOI");
+CREATE INDEX IF NOT EXISTS articles_title ON articles ("NormTitle");
+
+CREATE TABLE IF NOT EXISTS authors (
+    "Id" INTEGER PRIMARY KEY,
+    "Study" TEXT REFERENCES articles ("Study"),
+    "Citation" TEXT,
+    "Year",
+    "Venue" TEXT,
+    "Title" TEXT,
+    "Publication" TEXT,
+    "Author" TEXT,
+    "Department" TEXT,
+    "Institution" TEXT,
+    "City" TEXT,
+    "Country" TEXT,
+    "Continent" TEXT
+);
+CREATE INDEX IF NOT EXISTS authors_study ON authors ("Study");
+CREATE INDEX IF NOT EXISTS authors_citation ON authors ("Citation");
+
+CREATE TABLE IF NOT EXISTS synced_files (
+    "Path" TEXT PRIMARY KEY,
+    "Mtime" INTEGER
+);
+"""
+
+# Columns used only inside the database
+_internal_columns = {"articles": ["NormTitle", "NormDOI"], "authors": ["Id"]}
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def connect(db_path):
+    conn = sqlite3.connect(db_path)
+    # Readers do not block the writer, so several reviewers can use the same database
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(schema)
+    return conn
+
+
+def _ensure_columns(conn, table, columns):
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for column in columns:
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {_quote(column)}")
+
+
+def _rows(df):
+    return df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+
+
+def _with_keys(df_articles):
+    df_articles = df_articles.copy()
+    df_articles["NormTitle"] = [normalize_title(title) for title in df_articles.get("Title", [])]
+    df_articles["NormDOI"] = [normalize_doi(doi) if isinstance(doi, str) else ""
+                              for doi in df_articles.get("DOI", [])]
+    return df_articles
+
+
+def _insert(conn, table, df):
+    _ensure_columns(conn, table, df.columns)
+    columns = ", ".join(_quote(column) for column in df.columns)
+    values = ", ".join("?" * len(df.columns))
+    conn.executemany(f"INSERT INTO {table} ({columns}) VALUES ({values})", _rows(df))
+
+
+# Replace the content of the database with the given tables, in a single transaction
+def import_tables(conn, df_articles, df_authors):
+    with conn:
+        conn.execute("DELETE FROM authors")
+        conn.execute("DELETE FROM articles")
+        _insert(conn, "articles", _with_keys(df_articles))
+        _insert(conn, "authors", df_authors)
+
+
+def count_articles(conn):
+    return conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+
+def existing_titles(conn):
+    return {row[0] for row in conn.execute('SELECT "NormTitle" FROM articles')}
+
+
+# Insert the new studies of a Bibtex update, in a single transaction. As with the xlsx tables, the studies
+# already in the database are left as they are, with the values the reviewers corrected by hand.
+# The transaction takes the write lock before reading the known titles and the number of studies, so that two
+# updates running at the same time cannot insert the same study or give two studies the same number.
+# "build_rows(records, first_study_number)" returns the article and author rows of the records.
+def insert_bibtex(conn, records, build_rows):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        known_titles = existing_titles(conn)
+        new_records = [record for record in records if normalize_title(record.title) not in known_titles]
+        if new_records:
+            df_new_articles, df_new_authors = build_rows(new_records, count_articles(conn) + 1)
+            _insert(conn, "articles", _with_keys(df_new_articles))
+            _insert(conn, "authors", df_new_authors)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return new_records
+
+
+# Record the modification times of the xlsx tables, once they were imported into or exported from the database
+def record_sync(conn, file_paths):
+    with conn:
+        conn.executemany('INSERT OR REPLACE INTO synced_files ("Path", "Mtime") VALUES (?, ?)',
+                         [(os.path.abspath(file_path), os.stat(file_path).st_mtime_ns)
+                          for file_path in file_paths if os.path.exists(file_path)])
+
+
+# The xlsx tables edited since they were last imported or exported: their changes are not in the database.
+# Without a record, a table counts as edited when it is newer than the database.
+def edited_since_sync(conn, file_paths, db_path):
+    synced = dict(conn.execute('SELECT "Path", "Mtime" FROM synced_files'))
+    edited = []
+    for file_path in file_paths:
+        if not os.path.exists(file_path):
+            continue
+        mtime = os.stat(file_path).st_mtime_ns
+        recorded = synced.get(os.path.abspath(file_path))
+        if mtime != recorded if recorded is not None else mtime > os.stat(db_path).st_mtime_ns:
+            edited.append(file_path)
+    return edited
+
+
+def read_tables(conn):
+    tables = []
+    for table in ("articles", "authors"):
+        df = pd.read_sql_query(f"SELECT * FROM {table} ORDER BY rowid", conn)
+        tables.append(df.drop(columns=_internal_columns[table]))
+    return tables[0], tables[1]
@@ -0,0 +1,176 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from dimension_counts import split_dimension_values
+
+# Inverted index of the articles table: for each dimension, the normalized values of its comma-separated cells
+# map to a bitmap of the rows that have them. Bitmaps are Python ints (bit i set for row i), so AND, OR and NOT
+# over a whole review are a few machine operations.
+#   values: {dimension: {normalized value: bitmap}}
+#   years: {year: bitmap}
+#   num_rows: number of rows of the table, all: bitmap of every row
+_query_token = re.compile(r'("[^"]*")|\s*(\(|\)|\bAND\b|\bOR\b|\bNOT\b)\s*')
+_operators = {"(", ")", "AND", "OR", "NOT"}
+_condition = re.compile(r"^(.+?)\s*(>=|<=|!=|=|<|>)\s*(.+)$")
+
+
+def normalize_value(value):
+    return " ".join(str(value).replace('"', "").casefold().split())
+
+
+def to_bitmap(mask):
+    return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+
+
+def _bitmaps(positions, keys, num_rows):
+    bitmaps = {}
+    codes, uniques = pd.factorize(keys)
+    for code, key in enumerate(uniques):
+        mask = np.zeros(num_rows, dtype=bool)
+        mask[positions[codes == code]] = True
+        bitmaps[key] = to_bitmap(mask)
+    return bitmaps
+
+
+def build_index(df_articles, dimensions):
+    num_rows = len(df_articles.index)
+    index = {"num_rows": num_rows, "all": (1 << num_rows) - 1, "values": {}, "years": {}}
+    for dimension in dimensions:
+        if dimension not in df_articles.columns:
+            continue
+        values = split_dimension_values(df_articles[dimension].reset_index(drop=True))
+        keys = values.map(normalize_value)
+        index["values"][dimension] = _bitmaps(values.index.to_numpy(), keys.to_numpy(), num_rows)
+
+    if "Year" in df_articles.columns:
+        years = pd.to_numeric(df_articles["Year"].astype(object), errors="coerce").to_numpy()
+        known = ~np.isnan(years)
+        index["years"] = _bitmaps(np.flatnonzero(known), years[known].astype(int), num_rows)
+    return index
+
+
+def count(bitmap):
+    if hasattr(bitmap, "bit_count"):
+        return bitmap.bit_count()
+    return bin(bitmap).count("1")
+
+
+# Row positions of a bitmap, in table order
+def positions(index, bitmap):
+    num_bytes = (index["num_rows"] + 7) // 8
+    bits = np.unpackbits(np.frombuffer(bitmap.to_bytes(num_bytes, "little"), dtype=np.uint8), bitorder="little")
+    return np.flatnonzero(bits[:index["num_rows"]])
+
+
+def match(index, dimension, value):
+    return index["values"].get(dimension, {}).get(normalize_value(value), 0)
+
+
+def negate(index, bitmap):
+    return index["all"] & ~bitmap
+
+
+# Rows whose year is within [start, end]; a missing bound is open
+def year_range(index, start=None, end=None):
+    bitmap = 0
+    for year, year_bitmap in index["years"].items():
+        if (start is None or year >= start) and (end is None or year <= end):
+            bitmap |= year_bitmap
+    return bitmap
+
+
+def _dimension_name(index, name):
+    for dimension in index["values"]:
+        if dimension.casefold() == name.casefold():
+            return dimension
+    raise ValueError(f"Unknown dimension '{name}'")
+
+
+def _condition_bitmap(index, text):
+    condition = _condition.match(text)
+    if not condition:
+        raise ValueError(f"Invalid condition '{text}'")
+    name, operator, value = (part.strip() for part in condition.groups())
+    if name.casefold() == "year":
+        year = int(value.strip('"'))
+        bounds = {"=": (year, year), "!=": (year, year), ">=": (year, None), ">": (year + 1, None),
+                  "<=": (None, year), "<": (None, year - 1)}
+        bitmap = year_range(index, *bounds[operator])
+        return negate(index, bitmap) if operator == "!=" else bitmap
+    if operator not in ("=", "!="):
+        raise ValueError(f"Operator '{operator}' is only valid for the Year")
+    bitmap = match(index, _dimension_name(index, name), value)
+    return negate(index, bitmap) if operator == "!=" else bitmap
+
+
+# Split a query into its operators and conditions. A quoted value is part of its condition, even when it contains
+# parentheses or the words AND, OR and NOT.
+def _tokens(text):
+    if text.count('"') % 2:
+        raise ValueError(f"Unterminated quote in query '{text}'")
+    tokens = []
+    condition = ""
+    for part in _query_token.split(text):
+        if part in _operators:
+            if condition.strip():
+                tokens.append(condition.strip())
+            condition = ""
+            tokens.append(part)
+        elif part:
+            condition += part
+    if condition.strip():
+        tokens.append(condition.strip())
+    return tokens
+
+
+# Evaluate a query such as "Data source = Social media AND NOT Purpose = Planning AND Year >= 2020".
+# Conditions are "<dimension> = <value>", "<dimension> != <value>" or a comparison of the Year, combined with
+# AND, OR, NOT and parentheses (NOT binds tighter than AND, and AND tighter than OR). Values are quoted when
+# they contain parentheses or those words: Purpose = "Planning (urban)".
+def query(index, text):
+    tokens = _tokens(text)
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    def expression():
+        bitmap = term()
+        while peek() == "OR":
+            take()
+            bitmap |= term()
+        return bitmap
+
+    def term():
+        bitmap = factor()
+        while peek() == "AND":
+            take()
+            bitmap &= factor()
+        return bitmap
+
+    def factor():
+        token = peek()
+        if token is None:
+            raise ValueError(f"Incomplete query '{text}'")
+        take()
+        if token == "NOT":
+            return negate(index, factor())
+        if token == "(":
+            bitmap = expression()
+            if peek() != ")":
+                raise ValueError(f"Missing ')' in query '{text}'")
+            take()
+            return bitmap
+        return _condition_bitmap(index, token)
+
+    bitmap = expression()
+    if peek() is not None:
+        raise ValueError(f"Unexpected '{peek()}' in query '{text}'")
+    return bitmap
@@ -0,0 +1,67 @@
+import glob
+import hashlib
+import os
+
+import pandas as pd
+
+# Tables kept in memory between menu actions: xlsx path -> (xlsx mtime, DataFrame)
+_tables = {}
+
+
+def _shadow_prefix(cache_dir, xlsx_path):
+    name = hashlib.sha1(os.path.abspath(xlsx_path).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"table_{name}")
+
+
+def to_categories(df, category_columns):
+    for column in category_columns:
+        if column in df.columns and not pd.api.types.is_numeric_dtype(df[column]) \
+                and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype("category")
+    return df
+
+
+def _write_shadow(df, shadow_prefix, mtime):
+    for old_file_path in glob.glob(f"{shadow_prefix}_*"):
+        os.remove(old_file_path)
+    try:
+        df.to_feather(f"{shadow_prefix}_{mtime}.feather")
+    except (ImportError, TypeError, ValueError):
+        # Feather needs pyarrow and one type per column; anything else is pickled
+        if os.path.exists(f"{shadow_prefix}_{mtime}.feather"):
+            os.remove(f"{shadow_prefix}_{mtime}.feather")
+        df.to_pickle(f"{shadow_prefix}_{mtime}.pickle")
+
+
+def _read_shadow(shadow_prefix, mtime):
+    if os.path.exists(f"{shadow_prefix}_{mtime}.feather"):
+        return pd.read_feather(f"{shadow_prefix}_{mtime}.feather")
+    if os.path.exists(f"{shadow_prefix}_{mtime}.pickle"):
+        return pd.read_pickle(f"{shadow_prefix}_{mtime}.pickle")
+    return None
+
+
+# Load an xlsx table, reusing the resident copy or its columnar shadow copy while the xlsx file is unchanged
+def load_table(xlsx_path, cache_dir, category_columns=()):
+    mtime = os.stat(xlsx_path).st_mtime_ns
+    if xlsx_path in _tables and _tables[xlsx_path][0] == mtime:
+        return _tables[xlsx_path][1]
+
+    shadow_prefix = _shadow_prefix(cache_dir, xlsx_path)
+    df = _read_shadow(shadow_prefix, mtime)
+    if df is None:
+        df = to_categories(pd.read_excel(xlsx_path), category_columns)
+        os.makedirs(cache_dir, exist_ok=True)
+        _write_shadow(df, shadow_prefix, mtime)
+    _tables[xlsx_path] = (mtime, df)
+    return df
+
+
+# Record a table that was just written to "xlsx_path", so it is not read back from the xlsx file
+def store_table(df, xlsx_path, cache_dir, category_columns=()):
+    mtime = os.stat(xlsx_path).st_mtime_ns
+    df = to_categories(df.copy(), category_columns)
+    os.makedirs(cache_dir, exist_ok=True)
+    _write_shadow(df, _shadow_prefix(cache_dir, xlsx_path), mtime)
+    _tables[xlsx_path] = (mtime, df)
+    return df
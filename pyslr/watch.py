@@ -0,0 +1,159 @@
+import os
+import time
+import traceback
+
+import slr
+
+# Columns of the articles table shown in the LaTeX information table
+information_columns = {"Study", "Year", "Citation", "Title", "Publication"}
+
+
+# Modification time and size of each file, None when it does not exist
+def snapshot(file_paths):
+    stats = {}
+    for file_path in file_paths:
+        try:
+            stat = os.stat(file_path)
+            stats[file_path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stats[file_path] = None
+    return stats
+
+
+def watched_files(config_path):
+    if slr.storage == "sqlite":
+        tables = [slr.database_path, slr.database_path + "-wal"]
+    else:
+        tables = [slr.slr_articles_path, slr.slr_authors_path]
+    return [config_path, slr.bib_path, *tables]
+
+
+# Wait for a change of the watched files, then until they stay unchanged for "debounce" seconds, so a burst
+# of saves triggers a single rebuild. Returns the files that changed.
+def wait_for_changes(file_paths, stats, interval, debounce):
+    while True:
+        time.sleep(interval)
+        current = snapshot(file_paths)
+        if current != stats:
+            break
+    stable_since = time.monotonic()
+    while time.monotonic() - stable_since < debounce:
+        time.sleep(interval)
+        latest = snapshot(file_paths)
+        if latest != current:
+            current = latest
+            stable_since = time.monotonic()
+    return [file_path for file_path in file_paths if current[file_path] != stats[file_path]]
+
+
+# Columns whose values changed between two versions of a table, and the number of changed rows.
+# Returns None for the columns when studies were added, removed or reordered, as every output changes then.
+def changed_columns(df_old, df_new):
+    from dimension_counts import as_text
+
+    if df_old is None or len(df_old.index) != len(df_new.index) or \
+            list(as_text(df_old["Study"])) != list(as_text(df_new["Study"])):
+        return None, len(df_new.index)
+    columns = set()
+    rows = None
+    for column in df_new.columns:
+        if column not in df_old.columns:
+            columns.add(column)
+            continue
+        row_changes = as_text(df_old[column]).to_numpy() != as_text(df_new[column]).to_numpy()
+        if row_changes.any():
+            columns.add(column)
+            rows = row_changes if rows is None else rows | row_changes
+    columns |= set(df_old.columns) - set(df_new.columns)
+    return columns, 0 if rows is None else int(rows.sum())
+
+
+def _affected(names, columns):
+    return [name for name in names if columns is None or name in columns]
+
+
+# Regenerate the counts, figures and LaTeX tables that depend on the changed columns
+def rebuild(article_columns, author_columns):
+    from dimension_counts import compute_dimension_counts
+
+    dimensions = _affected(slr.dimensions.keys(), article_columns)
+    if dimensions:
+        counts = compute_dimension_counts(slr.df_articles, dimensions)
+        if counts["dimensions"]:
+            slr.create_dimension_plots(counts)
+    # The stacked plots and the heatmap read the co-occurrence matrix, as in the build
+    stacked = [(dim1, dim2) for dim1, dim2 in slr.stacked_dimensions
+               if article_columns is None or dim1 in article_columns or dim2 in article_columns]
+    if stacked:
+        slr.create_stacked_dimension_plots(pairs=stacked)
+    if _affected(slr.cooccurrence_dimensions, article_columns):
+        slr.create_cooccurrence_heatmap()
+
+    radar_columns = ["Study", *(f"{dimension} score" for dimension in slr.radar_dimensions)]
+    if _affected(radar_columns, article_columns):
+        slr.create_radar_plots()
+
+    levels = _affected(slr.geography_levels.keys(), author_columns)
+    if levels:
+        from geography import compute_geography_counts
+
+        slr.create_geography_plots(compute_geography_counts(slr.df_authors, levels))
+
+    # The author network reads the articles table, the other networks the authors table
+    article_network_columns = ["Study", "Authors"] if "Author" in slr.network_levels else []
+    author_network_columns = ["Study", *(level for level in slr.network_levels if level != "Author")]
+    if _affected(article_network_columns, article_columns) or _affected(author_network_columns, author_columns):
+        slr.create_network_analysis()
+
+    if _affected(information_columns, article_columns):
+        slr.create_latex_information_table()
+    if _affected(["Citation", *slr.table_dimensions.keys()], article_columns):
+        slr.create_latex_summary_table()
+
+    print(f"Rebuilt {len(dimensions)} dimension, {len(stacked)} stacked and {len(levels)} geography figures")
+
+
+# Rebuild the outputs once, then every time the tables, the Bibtex file or the configuration change
+def watch(config_path, interval=1.0, debounce=2.0):
+    slr.headless = True
+    slr.load_tables()
+    rebuild(None, None)
+
+    stats = snapshot(watched_files(config_path))
+    print(f"Watching {', '.join(path for path in stats)} (Ctrl+C to stop)")
+    try:
+        while True:
+            changed = wait_for_changes(list(stats), stats, interval, debounce)
+            print(f"Changed: {', '.join(changed)}")
+            try:
+                on_change(config_path, changed)
+            except Exception:
+                # A table saved halfway or a broken configuration: keep the previous state and wait for the next save
+                traceback.print_exc()
+            slr.report_instrumentation()
+            # Outputs written by the rebuild itself (the tables updated from the Bibtex file) are not changes
+            stats = snapshot(watched_files(config_path))
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+
+
+def on_change(config_path, changed):
+    if config_path in changed:
+        slr.load_config(config_path)
+        slr.headless = True
+        slr.load_tables()
+        rebuild(None, None)
+        return
+
+    if slr.bib_path in changed:
+        slr.update_slr_tables_from_bibtex()
+
+    df_articles, df_authors = slr.df_articles, slr.df_authors
+    slr.load_tables()
+    article_columns, article_rows = changed_columns(df_articles, slr.df_articles)
+    author_columns, author_rows = changed_columns(df_authors, slr.df_authors)
+    print(f"{article_rows} article rows and {author_rows} author rows changed")
+    if article_columns is None:
+        # The number of studies is in the title of every figure
+        author_columns = None
+    rebuild(article_columns, author_columns)
@@ -0,0 +1,18 @@
+from openpyxl import Workbook
+
+# Rows converted from the DataFrame at a time; only one chunk is held as Python objects
+chunk_size = 10000
+
+
+# Write a table to an xlsx file through openpyxl's write-only workbook, which streams the rows to disk
+# instead of building every cell in memory as DataFrame.to_excel does. The layout is the same: a header
+# row with the column names, then one row per DataFrame row, in "Sheet1".
+def write_excel(df, file_path, sheet_name="Sheet1"):
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append([str(column) for column in df.columns])
+    for start in range(0, len(df.index), chunk_size):
+        chunk = df.iloc[start:start + chunk_size].astype(object)
+        for row in chunk.where(chunk.notna(), None).itertuples(index=False, name=None):
+            sheet.append(row)
+    workbook.save(file_path)
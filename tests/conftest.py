@@ -0,0 +1,50 @@
+import json
+import os
+import sys
+
+import pytest
+
+# The modules of pyslr import each other as top-level modules, as when running pyslr/slr.py
+pyslr_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pyslr")
+sys.path.insert(0, pyslr_dir)
+
+bib_entries = {
+    "smith2019": ("article", "Mining tourist trajectories from geotagged photos", "2019", "Smith, John and Doe, Jane",
+                  "journal = {Tourism Management}"),
+    "lee2021": ("inproceedings", "Visual analytics of hotel reviews", "2021", "Lee, Ann",
+                "booktitle = {Proceedings of VIS}"),
+    "garcia2022": ("article", "Spatial scales of (urban) tourism", "2022", "Garcia, Luis and Smith, John",
+                   "journal = {Annals of Tourism Research}"),
+}
+
+
+def bib_text(keys):
+    entries = []
+    for key in keys:
+        entry_type, title, year, authors, venue = bib_entries[key]
+        entries.append(f"@{entry_type}{{{key},\n  title = {{{title}}},\n  year = {{{year}}},\n"
+                       f"  author = {{{authors}}},\n  {venue},\n  doi = {{10.1000/{key}}}\n}}\n")
+    return "\n".join(entries)
+
+
+# A review in a temporary folder, with the default configuration and a Bibtex file of the given entries
+@pytest.fixture
+def review(tmp_path):
+    import slr
+
+    with open(os.path.join(pyslr_dir, "config.json")) as file:
+        config = json.load(file)
+    config.update({"root_dir": "", "parse_workers": 1, "render_workers": 1, "headless": True})
+    config_path = str(tmp_path / "config.json")
+    with open(config_path, "w") as file:
+        json.dump(config, file)
+    os.makedirs(tmp_path / "references")
+
+    def write_bib(keys):
+        (tmp_path / "bib.bib").write_text(bib_text(keys), encoding="utf-8")
+
+    write_bib(["smith2019", "lee2021"])
+    slr.load_config(config_path)
+    slr.df_articles = slr.df_authors = None
+    yield slr, write_bib
+    slr.df_articles = slr.df_authors = None
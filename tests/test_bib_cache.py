@@ -0,0 +1,52 @@
+import os
+
+import bib_cache
+from bib_cache import _cache_file_path, read_bib_files
+from conftest import bib_text
+
+
+def _write(tmp_path, name, keys):
+    file_path = tmp_path / name
+    file_path.write_text(bib_text(keys), encoding="utf-8")
+    return str(file_path)
+
+
+def _keys(record_streams):
+    return [[record.key for record in records] for records in record_streams]
+
+
+def test_hits_and_misses_of_each_read(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    file_paths = [_write(tmp_path, "a.bib", ["smith2019"]), _write(tmp_path, "b.bib", ["lee2021", "garcia2022"])]
+    record_streams, stats = read_bib_files(file_paths, cache_dir)
+    assert stats == {"hits": 0, "misses": 2}
+    assert _keys(record_streams) == [["smith2019"], ["lee2021", "garcia2022"]]
+
+    record_streams, stats = read_bib_files(file_paths, cache_dir)
+    assert stats == {"hits": 2, "misses": 0}
+    assert _keys(record_streams) == [["smith2019"], ["lee2021", "garcia2022"]]
+
+    _write(tmp_path, "b.bib", ["lee2021"])
+    record_streams, stats = read_bib_files(file_paths, cache_dir)
+    assert stats == {"hits": 1, "misses": 1}
+    assert _keys(record_streams) == [["smith2019"], ["lee2021"]]
+
+
+def test_touched_file_keeps_its_cached_records(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    file_path = _write(tmp_path, "a.bib", ["smith2019", "lee2021"])
+    read_bib_files([file_path], cache_dir)
+    cache_file_path = _cache_file_path(cache_dir, file_path)
+    records_mtime = os.stat(cache_file_path).st_mtime_ns
+
+    mtime = os.stat(file_path).st_mtime_ns + 10 ** 9
+    os.utime(file_path, ns=(mtime, mtime))
+    record_streams, stats = read_bib_files([file_path], cache_dir)
+    assert stats == {"hits": 1, "misses": 0}
+    assert _keys(record_streams) == [["smith2019", "lee2021"]]
+    assert os.stat(cache_file_path).st_mtime_ns == records_mtime
+
+    # The new mtime is recorded, so the next read does not hash the file again
+    monkeypatch.setattr(bib_cache, "file_digest", None)
+    record_streams, stats = read_bib_files([file_path], cache_dir)
+    assert stats == {"hits": 1, "misses": 0}
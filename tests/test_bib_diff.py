@@ -0,0 +1,28 @@
+from bib_diff import diff_entries, duplicate_keys
+
+old_entries = [("old1", "Mining tourist trajectories", "10.1000/a"),
+               ("old2", "Visual analytics of hotel reviews", "10.1000/b"),
+               ("old3", "Spatial scales of tourism", None)]
+
+
+def test_matches():
+    new_entries = [("new1", "Mining Tourist Trajectories.", "https://doi.org/10.1000/A"),
+                   ("new2", "Another title", "10.1000/b"),
+                   ("new3", "Spatial scales of {T}ourism", "10.1000/c"),
+                   ("new4", "A new study", "10.1000/d")]
+    matches = diff_entries(old_entries, new_entries)
+    assert matches == {"exact": [("new1", "old1")], "conflict": [], "doi": [("new2", "old2")],
+                       "title": [("new3", "old3")]}
+    assert duplicate_keys(matches) == {"new1", "new2", "new3"}
+
+
+def test_title_and_doi_of_different_entries_are_a_conflict():
+    matches = diff_entries(old_entries, [("new1", "Mining tourist trajectories", "10.1000/b")])
+    assert matches["exact"] == []
+    assert matches["conflict"] == [("new1", "old1 (title), old2 (DOI)")]
+
+
+def test_exact_match_with_repeated_titles():
+    entries = [*old_entries, ("old4", "Mining tourist trajectories", "10.1000/e")]
+    matches = diff_entries(entries, [("new1", "Mining tourist trajectories", "10.1000/e")])
+    assert matches["exact"] == [("new1", "old4")]
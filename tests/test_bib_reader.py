@@ -0,0 +1,48 @@
+from bib_reader import iter_bib_chunks, iter_bib_records, parse_bib_file
+from conftest import bib_text
+
+
+def test_chunks_follow_nested_delimiters():
+    lines = ["@article{a, title = {A {Nested} title},\n", "  year = {2020}}  @book(b, title = {B (x)})\n",
+             "% a comment\n", "@misc{c,\n", "title={C}\n", "}\n"]
+    assert list(iter_bib_chunks(lines)) == ["@article{a, title = {A {Nested} title},\n  year = {2020}}",
+                                            "@book(b, title = {B (x)})", "@misc{c,\ntitle={C}\n}"]
+
+
+def test_records_match_a_whole_file_parse(tmp_path):
+    from pybtex.database import parse_file
+
+    bib_path = tmp_path / "refs.bib"
+    bib_path.write_text(bib_text(["smith2019", "lee2021", "garcia2022"]), encoding="utf-8")
+    records = parse_bib_file(str(bib_path))
+    entries = parse_file(str(bib_path)).entries
+    assert [record.key for record in records] == list(entries.keys())
+    assert [record.title for record in records] == [entry.fields["title"] for entry in entries.values()]
+    assert records[0].authors == ("Smith, John", "Doe, Jane")
+    assert records[0].main_author == "Smith"
+    assert records[1].venue == "Conference"
+    assert records[1].publication == "Proceedings of VIS"
+
+
+def test_macros_and_repeated_keys(tmp_path):
+    bib_path = tmp_path / "refs.bib"
+    bib_path.write_text('@string{tm = "Tourism Management"}\n'
+                        "@article{a, title = {First}, journal = tm, year = {2020}, author = {Doe, Jane}}\n"
+                        "@article{A, title = {Repeated}, year = {2021}, author = {Doe, Jane}}\n", encoding="utf-8")
+    records = list(iter_bib_records(str(bib_path)))
+    assert [record.title for record in records] == ["First"]
+    assert records[0].publication == "Tourism Management"
+
+
+def test_paren_entries_with_unbalanced_parentheses_in_values(tmp_path):
+    from pybtex.database import parse_file
+
+    bib_path = tmp_path / "refs.bib"
+    bib_path.write_text("@article(p1, title = {Normal}, year = {2020}, author = {Doe, Jane})\n"
+                        "@article(p2, title = {Paren :) title}, year = {2021}, author = {Doe, Jane})\n"
+                        '@article(p3, title = "Quoted ) paren", year = 2022, author = {Doe, Jane})\n',
+                        encoding="utf-8")
+    records = parse_bib_file(str(bib_path))
+    entries = parse_file(str(bib_path)).entries
+    assert [record.key for record in records] == ["p1", "p2", "p3"]
+    assert [record.title for record in records] == [entry.fields["title"] for entry in entries.values()]
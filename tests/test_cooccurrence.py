@@ -0,0 +1,55 @@
+from itertools import product
+
+import pandas as pd
+
+from cooccurrence import build_cooccurrence, cooccurrence_frame, pair_counts
+from dimension_counts import compute_dimension_counts
+
+articles = pd.DataFrame({
+    "Year": [2021, 2019, 2021, 2020, 2019],
+    "Data source": ["Social media, GPS", "GPS", '"N/A"', "Social media, Social media", "GPS, Surveys"],
+    "Purpose": ["Planning", "Planning, Marketing", "Marketing", None, "Planning"],
+})
+dimensions = ["Year", "Data source", "Purpose"]
+
+
+def _values(cell):
+    return {value.strip().replace('"', "") for value in str(cell).split(",")}
+
+
+# Studies having each pair of values, counted study by study
+def _brute_force(dim1, dim2):
+    counts = {}
+    for _, row in articles.iterrows():
+        for x, y in product(_values(row[dim1]), _values(row[dim2])):
+            counts[(x, y)] = counts.get((x, y), 0) + 1
+    return counts
+
+
+def test_pair_counts_match_a_count_per_study():
+    cooccurrence = build_cooccurrence(articles, dimensions)
+    for dim1, dim2 in product(dimensions, repeat=2):
+        counts = pair_counts(cooccurrence, dim1, dim2)
+        expected = _brute_force(dim1, dim2)
+        assert {(x, y): n for x, row in counts.items() for y, n in row.items() if n} == expected
+
+
+def test_pair_count_totals():
+    cooccurrence = build_cooccurrence(articles, dimensions)
+    counts = pair_counts(cooccurrence, "Year", "Data source")
+    assert list(counts) == ["2019", "2020", "2021"]
+    # Each study counts once per pair of values: 2 values in 2021, 1 in 2020, 3 in 2019
+    assert {year: sum(row.values()) for year, row in counts.items()} == {"2019": 3, "2020": 1, "2021": 3}
+    assert sum(sum(row.values()) for row in counts.values()) == 7
+
+
+def test_diagonal_matches_the_dimension_counts():
+    cooccurrence = build_cooccurrence(articles, dimensions)
+    frame = cooccurrence_frame(cooccurrence)
+    dimension_counts = compute_dimension_counts(articles, dimensions)["dimensions"]
+    for dimension, counts in dimension_counts.items():
+        for value, n in counts.items():
+            # A value repeated in a cell counts once in the matrix
+            studies = sum(value in _values(cell) for cell in articles[dimension])
+            assert frame.loc[f"{dimension}: {value}", f"{dimension}: {value}"] == studies
+            assert n >= studies
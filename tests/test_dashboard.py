@@ -0,0 +1,34 @@
+import asyncio
+import re
+from urllib.parse import unquote
+
+from dashboard import Dashboard
+
+name = "Source/type? #1 (100%)"
+
+
+def _dashboard(monkeypatch):
+    import slr
+
+    monkeypatch.setattr(slr, "dimensions", {name: ["B"]}, raising=False)
+    dashboard = Dashboard("config.json", check_interval=3600)
+    dashboard.aggregates = {"summary": {"num_studies": 3, "dimensions": [name], "stacked": [], "geography": [],
+                                        "radar_dimensions": []},
+                            "dimensions": {name: {"A": 2, "B": 1}}, "stacked": {}, "geography": {}, "radar": []}
+    dashboard.checked_at = float("inf")
+    return dashboard
+
+
+def test_figure_urls_are_a_single_path_segment(monkeypatch):
+    dashboard = _dashboard(monkeypatch)
+    sources = re.findall(r'src="([^"]+)"', dashboard.index_page().decode("utf-8"))
+    assert len(sources) == 1
+    assert sources[0].count("/") == 3 and "?" not in sources[0] and "#" not in sources[0]
+    assert unquote(sources[0]) == f"/figures/dimension/{name}.svg"
+
+    async def request():
+        return await dashboard.handle(sources[0])
+
+    content_type, body = asyncio.run(request())
+    assert content_type == "svg"
+    assert body.lstrip().startswith(b"<?xml")
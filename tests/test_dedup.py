@@ -0,0 +1,33 @@
+import pytest
+
+from dedup import find_duplicate_clusters, lsh_candidate_pairs, make_permutations, minhash_signature, title_shingles
+
+
+def _signatures(titles, num_perm=64):
+    permutations = make_permutations(num_perm)
+    return [minhash_signature(title_shingles(title, 3), permutations) for title in titles]
+
+
+def test_identical_titles_share_a_band():
+    signatures = _signatures(["Mining tourist trajectories", "Mining tourist trajectories", "Urban heat islands"])
+    assert lsh_candidate_pairs(signatures, 16) == {(0, 1)}
+
+
+@pytest.mark.parametrize("bands", [0, 65, 10])
+def test_bands_must_divide_the_permutations(bands):
+    with pytest.raises(ValueError):
+        lsh_candidate_pairs(_signatures(["A title", "Another title"]), bands)
+
+
+def test_no_signatures():
+    assert lsh_candidate_pairs([], 16) == set()
+
+
+def test_clusters_of_near_duplicates():
+    titles = ["Mining tourist trajectories from geotagged photos",
+              "Mining tourist trajectories from geo-tagged photos.",
+              "A survey of visual analytics for tourism",
+              "Mining Tourist Trajectories from Geotagged Photos"]
+    clusters = find_duplicate_clusters(titles, threshold=0.8)
+    assert [members for members, _ in clusters] == [[0, 1, 3]]
+    assert 0.8 <= clusters[0][1] <= 1.0
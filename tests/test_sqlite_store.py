@@ -0,0 +1,104 @@
+import os
+import time
+
+import pytest
+
+from xlsx_writer import write_excel
+
+
+@pytest.fixture
+def database_review(review, monkeypatch):
+    slr, write_bib = review
+    slr.storage = "sqlite"
+    # The tables of the tests have no classification columns for the LaTeX summary table
+    monkeypatch.setattr(slr, "create_latex_information_table", lambda: None)
+    monkeypatch.setattr(slr, "create_latex_summary_table", lambda: None)
+    slr.create_table_files_from_bibtex()
+    slr.load_tables()
+    return slr, write_bib
+
+
+def _touch_later(file_path):
+    mtime = os.stat(file_path).st_mtime_ns + 10 ** 9
+    os.utime(file_path, ns=(mtime, mtime))
+
+
+def test_update_inserts_new_studies_and_keeps_known_ones(database_review):
+    from sqlite_store import connect
+
+    slr, write_bib = database_review
+    conn = connect(slr.database_path)
+    with conn:
+        conn.execute('UPDATE articles SET "Citation" = ?, "Comments" = ? WHERE "Study" = ?',
+                     ("smith2019corrected", "Classified", "S01"))
+        conn.execute('UPDATE authors SET "Country" = ? WHERE "Study" = ?', ("Portugal", "S01"))
+    conn.close()
+
+    write_bib(["smith2019", "lee2021", "garcia2022"])
+    slr.update_slr_tables_from_bibtex()
+    slr.load_tables()
+    articles = slr.df_articles.set_index("Study")
+    assert list(articles.index) == ["S01", "S02", "S03"]
+    assert articles.loc["S01", "Citation"] == "smith2019corrected"
+    assert articles.loc["S01", "Comments"] == "Classified"
+    assert articles.loc["S03", "Citation"] == "garcia2022"
+    authors = slr.df_authors
+    assert list(authors.loc[authors["Study"] == "S01", "Country"]) == ["Portugal", "Portugal"]
+    assert list(authors.loc[authors["Study"] == "S03", "Author"]) == ["Garcia, Luis", "Smith, John"]
+
+
+def test_update_without_new_entries_leaves_the_database(database_review):
+    slr, _ = database_review
+    database_mtime = os.stat(slr.database_path).st_mtime_ns
+    slr.update_slr_tables_from_bibtex()
+    assert os.stat(slr.database_path).st_mtime_ns == database_mtime
+    slr.load_tables()
+    assert list(slr.df_articles["Study"]) == ["S01", "S02"]
+
+
+def test_concurrent_updates_number_the_studies_in_order(database_review, tmp_path):
+    from bib_reader import parse_bib_file
+    from conftest import bib_text
+    from sqlite_store import connect, insert_bibtex
+
+    slr, _ = database_review
+    bib_path = tmp_path / "new.bib"
+    bib_path.write_text(bib_text(["garcia2022"]), encoding="utf-8")
+    records = parse_bib_file(str(bib_path))
+    # Both updates found the entry new before either inserted it
+    first, second = connect(slr.database_path), connect(slr.database_path)
+    assert [record.key for record in insert_bibtex(first, records, slr.build_table_rows)] == ["garcia2022"]
+    assert insert_bibtex(second, records, slr.build_table_rows) == []
+    first.close()
+    second.close()
+
+    slr.load_tables()
+    assert list(slr.df_articles["Study"]) == ["S01", "S02", "S03"]
+    assert list(slr.df_authors.loc[slr.df_authors["Study"] == "S03", "Author"]) == ["Garcia, Luis", "Smith, John"]
+
+
+def test_export_refuses_to_overwrite_edited_tables(database_review, capsys):
+    slr, _ = database_review
+    df_articles = slr.df_articles.copy()
+    df_articles["Comments"] = "Edited in the xlsx table"
+    write_excel(df_articles, slr.slr_articles_path)
+    _touch_later(slr.slr_articles_path)
+    edited_mtime = os.stat(slr.slr_articles_path).st_mtime_ns
+
+    slr.load_tables()
+    assert "was edited after it was last imported" in capsys.readouterr().out
+    slr.export_tables()
+    assert "Not exporting the tables" in capsys.readouterr().out
+    assert os.stat(slr.slr_articles_path).st_mtime_ns == edited_mtime
+
+
+def test_export_updates_the_sync_record(database_review, capsys):
+    from sqlite_store import connect, edited_since_sync
+
+    slr, _ = database_review
+    time.sleep(0.01)
+    slr.export_tables()
+    assert "Tables exported" in capsys.readouterr().out
+    conn = connect(slr.database_path)
+    assert edited_since_sync(conn, [slr.slr_articles_path, slr.slr_authors_path], slr.database_path) == []
+    conn.close()
@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+
+from study_index import build_index, count, positions, query
+
+articles = pd.DataFrame({
+    "Study": ["S01", "S02", "S03", "S04"],
+    "Year": [2018, 2020, 2021, 2022],
+    "Data source": ["Social media, GPS", "GPS", "Social media", '"N/A"'],
+    "Purpose": ["Planning (urban)", "Marketing AND sales", "Planning", "Planning (urban), Marketing AND sales"],
+})
+
+
+@pytest.fixture(scope="module")
+def index():
+    return build_index(articles, ["Data source", "Purpose"])
+
+
+def _studies(index, text):
+    return [articles["Study"][i] for i in positions(index, query(index, text))]
+
+
+@pytest.mark.parametrize("text, studies", [
+    ("Data source = Social media", ["S01", "S03"]),
+    ("data source = social  media", ["S01", "S03"]),
+    ("Data source = N/A", ["S04"]),
+    ("Data source != GPS", ["S03", "S04"]),
+    ("Data source = GPS OR Data source = N/A", ["S01", "S02", "S04"]),
+    ("Data source = Social media AND NOT Data source = GPS", ["S03"]),
+    ("NOT (Data source = GPS OR Year < 2021)", ["S03", "S04"]),
+    ("Year >= 2020 AND Year <= 2021", ["S02", "S03"]),
+    ("Year != 2020", ["S01", "S03", "S04"]),
+    ('Purpose = "Planning (urban)"', ["S01", "S04"]),
+    ('Purpose = "Marketing AND sales" AND Year > 2020', ["S04"]),
+    ('(Purpose = "Planning (urban)" OR Purpose = Planning) AND NOT Data source = "N/A"', ["S01", "S03"]),
+])
+def test_query(index, text, studies):
+    assert _studies(index, text) == studies
+
+
+def test_precedence(index):
+    # NOT binds tighter than AND, and AND tighter than OR
+    assert query(index, "Data source = GPS OR Data source = Social media AND Year > 2020") == \
+        query(index, "Data source = GPS OR (Data source = Social media AND Year > 2020)")
+    assert count(query(index, "NOT Data source = GPS AND Year < 2022")) == 1
+
+
+@pytest.mark.parametrize("text", ["Purpose = Planning (urban)", "(Data source = GPS", "Data source = GPS AND",
+                                  'Purpose = "Planning (urban)', "Color = Red", "Purpose > Planning"])
+def test_invalid_queries(index, text):
+    with pytest.raises(ValueError):
+        query(index, text)
@@ -0,0 +1,76 @@
+import os
+
+
+def _created(slr):
+    slr.df_articles, slr.df_authors = slr.create_table_files_from_bibtex()
+    slr.load_tables()
+
+
+def test_update_without_new_entries_keeps_the_tables(review):
+    slr, _ = review
+    _created(slr)
+    mtime = os.stat(slr.slr_articles_path).st_mtime_ns
+    slr.update_slr_tables_from_bibtex()
+    assert os.stat(slr.slr_articles_path).st_mtime_ns == mtime
+    slr.load_tables()
+    assert slr.df_articles["Year"].dtype == "int64"
+    assert list(slr.df_articles["Year"]) == [2019, 2021]
+
+
+def test_update_appends_new_entries_with_the_table_dtypes(review):
+    slr, write_bib = review
+    _created(slr)
+    dtypes = slr.df_articles.dtypes
+    write_bib(["smith2019", "lee2021", "garcia2022"])
+    slr.update_slr_tables_from_bibtex()
+    slr.load_tables()
+    assert list(slr.df_articles["Study"]) == ["S01", "S02", "S03"]
+    assert list(slr.df_articles["Year"]) == [2019, 2021, 2022]
+    assert slr.df_articles["Year"].dtype == "int64"
+    assert slr.df_articles["Total"].dtype == dtypes["Total"]
+    assert len(slr.df_authors.index) == 5
+
+
+def test_update_reads_tables_not_loaded_yet(review):
+    slr, write_bib = review
+    from xlsx_writer import write_excel
+
+    _created(slr)
+    df_articles = slr.df_articles.copy()
+    df_articles.loc[0, "Comments"] = "Classified"
+    write_excel(df_articles, slr.slr_articles_path)
+    slr.df_articles = slr.df_authors = None
+    write_bib(["smith2019", "lee2021", "garcia2022"])
+    slr.update_slr_tables_from_bibtex()
+    slr.load_tables()
+    assert list(slr.df_articles["Study"]) == ["S01", "S02", "S03"]
+    assert slr.df_articles.loc[0, "Comments"] == "Classified"
+
+
+def test_update_creates_missing_tables(review):
+    slr, _ = review
+    slr.update_slr_tables_from_bibtex()
+    slr.load_tables()
+    assert list(slr.df_articles["Study"]) == ["S01", "S02"]
+
+
+def test_update_with_empty_columns(review):
+    from xlsx_writer import write_excel
+
+    slr, write_bib = review
+    _created(slr)
+    # Columns the reviewers left empty are read back from the xlsx table as all-NaN floats
+    df_articles = slr.df_articles.copy()
+    df_articles["Comments"] = None
+    df_articles["DOI"] = None
+    write_excel(df_articles, slr.slr_articles_path)
+    slr.load_tables()
+    assert slr.df_articles["Comments"].dtype == "float64"
+
+    write_bib(["smith2019", "lee2021", "garcia2022"])
+    slr.update_slr_tables_from_bibtex()
+    slr.load_tables()
+    assert list(slr.df_articles["Study"]) == ["S01", "S02", "S03"]
+    assert slr.df_articles["Comments"].isna().tolist() == [True, True, False]
+    assert slr.df_articles.loc[2, "DOI"] == "10.1000/garcia2022"
+    assert slr.df_articles["Year"].dtype == "int64"